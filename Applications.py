@@ -5,15 +5,19 @@
 #   - requests the lower-layer (tcp_sender)
 #     to deliver each message using the tcp_send() function
 #
+# The bulk sending application keeps its messages in a send queue of
+# "backlog" messages, and hands as many of them to the tcp_sender as the
+# window allows (tcp_send_batch()) each time the window opens, optionally
+# shaped by a token bucket. Without a sending_interval, its queue is always
+# full (a saturating bulk transfer).
+#
 # The receiving application:
 #   - receives the message delivered by the lower-layer to its
 #      deliver_data() method.
 #   - does some basic validation.
 
-import simpy
-import random
-from Packet import Packet
 import sys
+from Logger import logger, INFO, ERROR
 
 class SendingApplication(object):
 
@@ -37,12 +41,116 @@ class SendingApplication(object):
             # Create a message (it's just a number for now)
             msg = self.total_messages_sent + 1
             
-            print("TIME:", self.env.now, "SENDING APP: trying to send data", msg)
+            if logger.info:
+                logger.log(INFO, self.env.now, "SENDING_APP", "send", data=msg)
             # Try to send it
             if self.tcp_sender.tcp_send(msg):
                 # If sending is successful, increment the total messages sent
                 self.total_messages_sent += 1
 
+class TokenBucket(object):
+    # "rate" tokens (messages) per unit of time, of which at most "bucket_size" can be saved up
+
+    def __init__(self, env, rate, bucket_size=1):
+        self.env = env
+        self.rate = rate
+        self.bucket_size = bucket_size
+        self.tokens = bucket_size
+        self.last_refill = env.now
+
+    def available(self):
+        # Number of whole tokens available now
+        now = self.env.now
+        if now != self.last_refill:
+            self.tokens = min(self.bucket_size, self.tokens + (now - self.last_refill) * self.rate)
+            self.last_refill = now
+        # (the tolerance absorbs the rounding errors of the refill times)
+        return int(self.tokens + 1e-9)
+
+    def take(self, n):
+        self.tokens -= n
+
+    def delay(self):
+        # Time until the next whole token
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+class BulkSendingApplication(object):
+
+    def __init__(self, env, sending_interval=None, backlog=64, token_rate=None, bucket_size=1):
+        # sending_interval: time between two new messages (None: the send queue is always full)
+        # backlog: size of the send queue (messages)
+        # token_rate, bucket_size: token bucket limiting the rate of messages handed to the tcp_sender
+        self.env = env
+        self.tcp_sender = None
+        self.sending_interval = sending_interval
+        self.backlog = backlog
+        self.token_bucket = TokenBucket(env, token_rate, bucket_size) if token_rate is not None else None
+        self.queued = 0 # messages waiting in the send queue
+        self.saturated = False # the send queue is always full
+        self.total_messages_sent = 0
+        self.messages_blocked = 0 # new messages that found the send queue full
+        self.wakeup = None # pending wake-up for the next token
+
+        # Start the behavior process
+        self.env.process(self.behavior())
+
+    def behavior(self):
+        # Get notified whenever the sender's window may have opened
+        self.tcp_sender.on_window_open = self.push
+        yield from self.arrivals()
+
+    def arrivals(self):
+        # Arrival process of the new messages (overridden by the workloads, see Workload.py)
+        if self.sending_interval is None:
+            self.saturated = True
+            self.queued = self.backlog
+            self.push()
+            return
+        assert(self.sending_interval > 0)
+        while True:
+            yield self.env.timeout(self.sending_interval)
+            self.enqueue(1)
+
+    def enqueue(self, count):
+        # Add "count" new messages to the send queue, as far as the backlog allows
+        space = self.backlog - self.queued
+        if count > space:
+            self.messages_blocked += count - space
+            count = space
+        self.queued += count
+        self.push()
+
+    def push(self):
+        # Hand the queued messages to the tcp_sender, as far as the window and the tokens allow
+        count = self.queued
+        if self.token_bucket is not None:
+            count = min(count, self.token_bucket.available())
+        if count:
+            # Messages are numbered in sending order, like in the SendingApplication
+            # (an unbounded saturated queue, backlog=float("inf"), offers
+            # sys.maxsize of them: far more than any window accepts)
+            first = self.total_messages_sent + 1
+            accepted = self.tcp_sender.tcp_send_batch(range(first, first + min(count, sys.maxsize)))
+            if accepted:
+                if logger.info:
+                    logger.log(INFO, self.env.now, "SENDING_APP", "send_batch", first=first, count=accepted)
+                self.total_messages_sent += accepted
+                if not self.saturated:
+                    self.queued -= accepted
+                if self.token_bucket is not None:
+                    self.token_bucket.take(accepted)
+            if accepted < count:
+                # The window is full: wait for it to open
+                return
+        if self.token_bucket is not None and self.queued and self.wakeup is None:
+            # Out of tokens: try again when the next one arrives
+            self.wakeup = self.env.timeout(self.token_bucket.delay())
+            self.wakeup.callbacks.append(self.on_token)
+
+    def on_token(self, event):
+        self.wakeup = None
+        self.push()
+
 class ReceivingApplication(object):
 
     def __init__(self, env):
@@ -50,14 +158,26 @@ class ReceivingApplication(object):
         self.env = env 
         self.total_messages_received = 0
 
+        # Event to trigger once a given number of messages has been received
+        self.stop_event = None
+        self.stop_after_messages = None
+
+    def stop_after(self, num_messages, event):
+        # Trigger "event" when the total number of received messages reaches num_messages
+        self.stop_event = event
+        self.stop_after_messages = num_messages
+
     def deliver_data(self, data):
         # This function is called by the lower-layer (tcp_receiver)
         # to deliver data to the Receiving Application
-        print("TIME:", self.env.now, "RECEIVING APP: received data", data)
+        if logger.info:
+            logger.log(INFO, self.env.now, "RECEIVING_APP", "deliver_data", data=data)
         self.total_messages_received += 1
+        if self.total_messages_received == self.stop_after_messages and not self.stop_event.triggered:
+            self.stop_event.succeed("max_messages")
         
         # Do some basic validation
         if not (data == self.total_messages_received):
-            print("ERROR!! RECEIVING APP: received wrong data:", data, ", expected:", self.total_messages_received)
-            print("Halting simulation...")
+            if logger.error:
+                logger.log(ERROR, self.env.now, "RECEIVING_APP", "wrong_data", data=data, expected=self.total_messages_received, action="halting simulation")
             sys.exit(0)
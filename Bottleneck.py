@@ -0,0 +1,221 @@
+# SimPy model for a bottleneck link shared by several TCP flows.
+#
+# Every flow attaches to the link and gets a port, which the tcp_Sender uses
+# as its channel (port.udt_send(packet, cwnd, RTT)). The link:
+#   - queues the packets of all the flows in a single FIFO buffer of
+#     "buffer_size" packets,
+#   - transmits one packet at a time, taking packet_length / transmission_rate
+#     (the serialization delay),
+#   - delivers each transmitted packet to the flow's receiver after
+#     "propagation_delay" amount of time.
+#
+# When the buffer fills up, packets are dropped by the drop policy:
+#   - DropTail: drop arriving packets when the buffer is full
+#   - RED: drop arriving packets early, with a probability that grows with the average queue length
+#   - CoDel: drop packets at the head of the queue when the queueing delay stays above a target
+#
+# The drop policy is given by name, with its parameters in drop_params. By
+# default, CoDel derives its time constants from the link, since the Internet
+# defaults (target 5 ms, interval 100 ms) do not fit the time scale of the
+# simulation: the interval is the base round trip time (2 * propagation_delay)
+# and the target 5% of it, as in the Internet defaults, but at least the
+# transmission time of a packet.
+#
+# The link keeps per-flow statistics, so that fairness, queueing delay and
+# aggregate throughput can be measured for N competing flows.
+
+import math
+from collections import deque
+from Logger import logger, INFO
+from Metrics import TimeSeries
+from RandomStreams import RandomStreams
+
+class DropTail(object):
+
+    def attach(self, link):
+        # Called once by the link the policy is used on
+        pass
+
+    def on_enqueue(self, link, packt):
+        # Returns True if the arriving packet must be dropped
+        return len(link.queue) >= link.buffer_size
+
+    def on_dequeue(self, link, sojourn_time):
+        # Returns True if the packet at the head of the queue must be dropped
+        return False
+
+class RED(DropTail):
+
+    def __init__(self, min_threshold=5, max_threshold=15, max_p=0.1, weight=0.002):
+        # Thresholds are in packets, weight is the gain of the average queue length
+        self.min_threshold = min_threshold
+        self.max_threshold = max_threshold
+        self.max_p = max_p
+        self.weight = weight
+        self.avg = 0.0
+
+    def on_enqueue(self, link, packt):
+        self.avg = (1 - self.weight) * self.avg + self.weight * len(link.queue)
+        if len(link.queue) >= link.buffer_size or self.avg >= self.max_threshold:
+            return True
+        if self.avg < self.min_threshold:
+            return False
+        p = self.max_p * (self.avg - self.min_threshold) / (self.max_threshold - self.min_threshold)
+        return link.rng.random() < p
+
+class CoDel(DropTail):
+
+    def __init__(self, target=None, interval=None):
+        # target: acceptable standing queueing delay, interval: time the delay may stay above target
+        # (derived from the link when None)
+        self.target = target
+        self.interval = interval
+        self.first_above_time = None
+        self.dropping = False
+        self.drop_next = 0.0
+        self.count = 0
+
+    def attach(self, link):
+        if self.interval is None:
+            self.interval = 2 * link.propagation_delay
+        if self.target is None:
+            self.target = max(0.05 * self.interval, link.packet_length / link.transmission_rate)
+
+    def on_dequeue(self, link, sojourn_time):
+        now = link.env.now
+        if sojourn_time < self.target or not link.queue:
+            # The queueing delay is acceptable again
+            self.first_above_time = None
+            self.dropping = False
+            return False
+        if self.first_above_time is None:
+            self.first_above_time = now + self.interval
+            return False
+        if not self.dropping:
+            if now < self.first_above_time:
+                return False
+            # Delay has been above target for a whole interval: start dropping
+            self.dropping = True
+            self.count = 1
+            self.drop_next = now + self.interval / math.sqrt(self.count)
+            return True
+        if now >= self.drop_next:
+            # Drop faster while the delay stays above target
+            self.count += 1
+            self.drop_next = now + self.interval / math.sqrt(self.count)
+            return True
+        return False
+
+DROP_POLICIES = {"droptail": DropTail, "red": RED, "codel": CoDel}
+
+class BottleneckPort(object):
+    # The channel seen by one flow attached to the bottleneck link
+
+    def __init__(self, link, flow_id, receiver):
+        self.link = link
+        self.env = link.env
+        self.name = "%s[%d]" % (link.name, flow_id)
+        self.flow_id = flow_id
+        self.receiver = receiver
+
+        # Per-flow statistics
+        self.cwnd_values = TimeSeries(**(link.recording or {}))
+        self.packets_sent = 0
+        self.packets_dropped = 0
+        self.packets_delivered = 0
+        self.bits_delivered = 0
+        self.queueing_delay_total = 0.0 # summed over the transmitted packets
+
+    def udt_send(self, packt, cwnd, RTT):
+        # Called by the flow's tcp_Sender to send a packet over the link
+        self.cwnd_values.record(self.env.now, cwnd)
+        self.packets_sent += 1
+        self.link.enqueue(self, packt)
+
+class BottleneckLink(object):
+
+    def __init__(self, env, name, propagation_delay, transmission_rate, buffer_size=64, drop_policy="droptail", rng=None, recording=None, drop_params=None, packet_length=16):
+        # Initialize variables
+        self.env = env
+        self.name = name
+        self.recording = recording # TimeSeries options of the per-flow cwnd series
+        # Random stream for the drop policies that need one (an unseeded one by default)
+        self.rng = rng if rng is not None else RandomStreams().stream(name)
+        self.propagation_delay = propagation_delay
+        self.transmission_rate = transmission_rate
+        self.buffer_size = buffer_size # packets
+        self.packet_length = packet_length # bits, length of the DATA packets of the flows (for the drop policies)
+        if isinstance(drop_policy, str):
+            drop_policy = DROP_POLICIES[drop_policy.lower()](**(drop_params or {}))
+        self.drop_policy = drop_policy
+        drop_policy.attach(self)
+
+        self.ports = []
+        self.queue = deque() # FIFO buffer of (port, packet, enqueue time)
+        self.wakeup = None # event the idle link waits on
+
+        # Variables to maintain statistics
+        self.channel_utilization_time = 0.0 # Total amount of time for which the link was transmitting
+        self.queueing_delay = TimeSeries() # sampled on every packet leaving the queue
+        self.queue_length = TimeSeries() # sampled on every packet arrival
+
+        # Start the transmitter process
+        self.env.process(self.transmit())
+
+    def attach(self, receiver):
+        # Attach a new flow delivering to "receiver", and return its port
+        port = BottleneckPort(self, len(self.ports), receiver)
+        self.ports.append(port)
+        return port
+
+    def enqueue(self, port, packt):
+        self.queue_length.record(self.env.now, len(self.queue))
+        if self.drop_policy.on_enqueue(self, packt):
+            self.drop(port, packt)
+            return
+        self.queue.append((port, packt, self.env.now))
+        if self.wakeup is not None:
+            # Wake up the idle transmitter
+            wakeup, self.wakeup = self.wakeup, None
+            wakeup.succeed()
+
+    def drop(self, port, packt):
+        port.packets_dropped += 1
+        if logger.info:
+            logger.log(INFO, self.env.now, port.name, "lost", seq_num=packt.seq_num, payload=packt.payload, packet_length=packt.packet_length)
+
+    def transmit(self):
+        # Transmit the queued packets one at a time
+        while True:
+            if not self.queue:
+                self.wakeup = self.env.event()
+                yield self.wakeup
+            port, packt, enqueued_at = self.queue.popleft()
+            sojourn_time = self.env.now - enqueued_at
+            if self.drop_policy.on_dequeue(self, sojourn_time):
+                self.drop(port, packt)
+                continue
+            self.queueing_delay.record(self.env.now, sojourn_time)
+            port.queueing_delay_total += sojourn_time
+
+            # Serialization delay
+            transmission_delay = packt.packet_length / self.transmission_rate
+            yield self.env.timeout(transmission_delay)
+            self.channel_utilization_time += transmission_delay
+
+            # The packet reaches the receiver after "propagation_delay" amount of time
+            self.env.call_later(self.propagation_delay, self.deliver, port, packt)
+
+    def deliver(self, port, packt):
+        port.packets_delivered += 1
+        port.bits_delivered += packt.packet_length
+        port.receiver.tcp_rcv(packt)
+
+def jain_fairness(values):
+    # Jain's fairness index: 1 when all the flows get the same share, 1/N at worst
+    values = list(values)
+    total = sum(values)
+    squares = sum(v * v for v in values)
+    if squares == 0:
+        return 1.0
+    return total * total / (len(values) * squares)
@@ -1,2 +0,0 @@
-Cwind = []
-Time = []
\ No newline at end of file
@@ -3,57 +3,83 @@
 # A packet sent over this channel:
 #   - can get lost, with probability Pl
 #   - reaches the other end after a "propagation_delay" amount of time, if it is not lost.
+#
+# The losses are drawn from the channel's own random stream (see RandomStreams.py).
+# The delivery is a plain callback scheduled with env.call_later() (see Kernel.py).
+#
+# With batch_delivery, the packets sent at the same time (a window opening,
+# or the re-transmissions of a timeout) reach the other end in one delivery,
+# through the receiver's tcp_rcv_batch(), so the number of scheduled events
+# grows with the number of distinct arrival times rather than with the
+# number of packets.
+#
+# With a TraceWriter as "trace" (see Trace.py), the channel records the
+# send, loss and delivery of every packet.
 
-import simpy
-import random
-from Packet import Packet
-import copy
+from Logger import logger, INFO
+from Metrics import TimeSeries
+from RandomStreams import RandomStreams
 
 class UnreliableChannel(object):
 
-    def __init__(self, env, name, propagation_delay, transmission_rate, bandwidth):
+    def __init__(self, env, name, propagation_delay, transmission_rate, bandwidth, rng=None, batch_delivery=False, recording=None):
         # Initialize variables
         self.env = env
         self.name = name
         self.propagation_delay = propagation_delay
         self.transmission_rate = transmission_rate
         self.receiver = None
+        # Random stream for the loss decisions (an unseeded one by default)
+        self.rng = rng if rng is not None else RandomStreams().stream(name)
+
+        # Batch delivery: the packets of the open batch all arrive at batch_time
+        self.batch_delivery = batch_delivery
+        self.batch = None
+        self.batch_time = None
+
+        # Per-packet event trace (a Trace.TraceWriter), disabled by default
+        self.trace = None
         
         self.bandwidth = bandwidth
         self.Pl = 0
-        self.cwnd_values = {}
-        self.bandwidth_util = {}
+        # Time series of the sender's congestion window and bandwidth utilization,
+        # sampled on every udt_send of a DATA packet. "recording" gives the
+        # TimeSeries options (e.g. {"mode": "bucket", "bucket": 10}), to bound
+        # the memory of long runs; every sample is kept by default.
+        self.cwnd_values = TimeSeries(**(recording or {}))
+        self.bandwidth_util = TimeSeries(**(recording or {}))
         
         # Variables to maintain statistics
         self.channel_utilization_time = 0.0  # Total amount of time for which the channel was utilized for transmission
         self.sender_rate = 0
         
-    def udt_send(self, packt_to_be_sent, cwnd, RTT):
+    def udt_send(self, packt, cwnd, RTT):
         # This function is called by the sending-side 
         # to send a new packet over the channel.
 
         # Calculate the sender's rate based on cwnd and RTT
         self.sender_rate = cwnd / RTT
-        # Record the bandwidth utilization at the current time
-        self.bandwidth_util[self.env.now] = self.sender_rate / self.bandwidth
-        # Record the congestion window size at the current time
-        self.cwnd_values[self.env.now] = cwnd
+        # Record the bandwidth utilization and the congestion window size at the
+        # current time (the ACK channel is given a negative cwnd: nothing to record)
+        if cwnd >= 0:
+            self.bandwidth_util.record(self.env.now, self.sender_rate / self.bandwidth)
+            self.cwnd_values.record(self.env.now, cwnd)
         
-        # Create a copy of the packet to avoid pass-by-reference issues
-        packt = copy.copy(packt_to_be_sent)
-        print("TIME:", self.env.now, self.name, ": udt_send called for", packt)
+        # Packets are immutable, so they are passed along without copying
+        if logger.info:
+            logger.log(INFO, self.env.now, self.name, "udt_send", seq_num=packt.seq_num, payload=packt.payload, packet_length=packt.packet_length)
+        if self.trace is not None:
+            # (the ACK channel is given a negative cwnd)
+            self.trace.record(self.env.now, self.name, "send", packt.seq_num, cwnd if cwnd >= 0 else float("nan"))
         
-        # Start a process to deliver this packet across the channel
-        self.env.process(self.deliver_packet_over_channel(self.propagation_delay, packt, self.sender_rate))
+        # Deliver this packet across the channel
+        self.deliver_packet_over_channel(self.propagation_delay, packt, self.sender_rate)
         
         # Update stats with the transmission delay for the packet
         transmission_delay_for_packet = packt.packet_length / self.transmission_rate
         self.channel_utilization_time += transmission_delay_for_packet
 
-    def deliver_packet_over_channel(self, propagation_delay, packt_to_be_delivered, sender_rate):
-        # Create a copy of the packet to avoid pass-by-reference issues
-        packt = copy.copy(packt_to_be_delivered)
-
+    def deliver_packet_over_channel(self, propagation_delay, packt, sender_rate):
         # Determine the probability of packet loss based on the sender rate and bandwidth
         if sender_rate > self.bandwidth:
             self.Pl = 1
@@ -63,11 +89,38 @@ class UnreliableChannel(object):
             self.Pl = 0.1
 
         # Check if the packet is lost
-        if random.random() < self.Pl:
-            print("TIME:", self.env.now, self.name, ":", packt, "was lost!")
+        if self.rng.random() < self.Pl:
+            if logger.info:
+                logger.log(INFO, self.env.now, self.name, "lost", seq_num=packt.seq_num, payload=packt.payload, packet_length=packt.packet_length)
+            if self.trace is not None:
+                self.trace.record(self.env.now, self.name, "lost", packt.seq_num)
         else:
-            # If the packet isn't lost, it should reach the destination.
-            # Wait for "propagation_delay" amount of time
-            yield self.env.timeout(propagation_delay)
-            # Deliver the packet by calling the tcp_rcv() function on the receiver side
-            self.receiver.tcp_rcv(packt)
+            # If the packet isn't lost, it should reach the destination
+            # after "propagation_delay" amount of time, where it is delivered
+            # by calling the tcp_rcv() function on the receiver side
+            if not self.batch_delivery:
+                self.env.call_later(propagation_delay, self.receiver.tcp_rcv if self.trace is None else self.deliver, packt)
+                return
+            arrival = self.env.now + propagation_delay
+            if self.batch is not None and self.batch_time == arrival:
+                self.batch.append(packt)
+            else:
+                self.batch = [packt]
+                self.batch_time = arrival
+                self.env.call_later(propagation_delay, self.deliver_batch, self.batch)
+
+    def deliver(self, packt):
+        # Delivery of a traced packet
+        self.trace.record(self.env.now, self.name, "deliver", packt.seq_num)
+        self.receiver.tcp_rcv(packt)
+
+    def deliver_batch(self, batch):
+        # Deliver the packets arriving together, in the order they were sent
+        if batch is self.batch:
+            self.batch = None
+        if logger.info:
+            logger.log(INFO, self.env.now, self.name, "deliver_batch", packets=len(batch))
+        if self.trace is not None:
+            for packt in batch:
+                self.trace.record(self.env.now, self.name, "deliver", packt.seq_num)
+        self.receiver.tcp_rcv_batch(batch)
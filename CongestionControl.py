@@ -0,0 +1,358 @@
+# Congestion-control strategies for the TCP sender.
+#
+# A strategy owns the window-update rules of the sender:
+#   - on_ack(): called when a new (cumulative) ACK arrives
+#   - on_dup_ack(): called when a duplicate ACK arrives
+#   - on_timeout(): called when the retransmission timer expires
+#
+# The sender keeps its congestion state (cwnd, ssthresh, state, cwnd_inc,
+# dupACKPackets) and the strategy updates it in place. When the sender uses
+# byte counting (for delayed ACKs), each ACK counts for the number of packets
+# it acknowledges (sender.acked_segments) instead of one. New algorithms are
+# added by subclassing CongestionControl and registering the class by name.
+
+import math
+from collections import deque
+
+# Constants for TCP states
+SLOW_START = 1
+CONGESTION_AVOIDANCE = 2
+FAST_RECOVERY = 3
+
+class CongestionControl(object):
+
+    name = None
+
+    def on_ack(self, sender):
+        # Grow the window on a new ACK according to the current state
+        if sender.state == SLOW_START:
+            if sender.byte_counting:
+                # At most 2 packets per ACK (RFC 3465)
+                sender.cwnd = sender.cwnd + min(sender.acked_segments, 2) * sender.data_packet_length
+            else:
+                sender.cwnd = sender.cwnd + sender.data_packet_length
+            sender.dupACKPackets = 0
+            if sender.cwnd >= sender.ssthresh:
+                self.leave_slow_start(sender)
+        elif sender.state == CONGESTION_AVOIDANCE:
+            self.congestion_avoidance(sender)
+            sender.dupACKPackets = 0
+        if sender.state == FAST_RECOVERY:
+            sender.cwnd = sender.ssthresh
+            sender.dupACKPackets = 0
+            sender.state = CONGESTION_AVOIDANCE
+
+    def on_dup_ack(self, sender):
+        # Returns True if the sender should fast-retransmit the missing packet
+        sender.dupACKPackets += 1
+        if sender.state == FAST_RECOVERY:
+            sender.cwnd = sender.cwnd + sender.data_packet_length
+        elif sender.dupACKPackets == 3:
+            sender.ssthresh = self.ssthresh_after_loss(sender)
+            sender.cwnd = sender.ssthresh + 3 * sender.data_packet_length
+            sender.state = FAST_RECOVERY
+            return True
+        return False
+
+    def on_timeout(self, sender):
+        sender.ssthresh = 0.8 * sender.cwnd
+        sender.cwnd = sender.data_packet_length
+        sender.dupACKPackets = 0
+        sender.state = SLOW_START
+
+    def ssthresh_after_loss(self, sender):
+        # Slow start threshold after 3 duplicate ACKs
+        if sender.cwnd <= 2 * sender.data_packet_length:
+            return sender.data_packet_length
+        return sender.cwnd / 2
+
+    def leave_slow_start(self, sender):
+        sender.state = CONGESTION_AVOIDANCE
+        sender.cwnd_inc = 0
+
+    def congestion_avoidance(self, sender):
+        raise NotImplementedError
+
+class AdditiveIncrease(CongestionControl):
+
+    def congestion_avoidance(self, sender):
+        # Grow by one packet once a full window has been acknowledged
+        increase = sender.data_packet_length * (sender.data_packet_length / sender.cwnd)
+        if sender.byte_counting:
+            # Count every acknowledged packet, and carry the excess over to the next window
+            sender.cwnd_inc += sender.acked_segments * increase
+            if sender.cwnd_inc >= sender.data_packet_length:
+                sender.cwnd = sender.cwnd + sender.data_packet_length
+                sender.cwnd_inc -= sender.data_packet_length
+            return
+        sender.cwnd_inc += increase
+        if sender.cwnd_inc == sender.data_packet_length:
+            sender.cwnd = sender.cwnd + sender.cwnd_inc
+            sender.cwnd_inc = 0
+
+class MultiplicativeIncrease(CongestionControl):
+
+    def congestion_avoidance(self, sender):
+        # Grow the window by 12.5% on every ACK (on every acknowledged packet with byte counting)
+        factor = 1.125 ** sender.acked_segments if sender.byte_counting else 1.125
+        sender.cwnd = sender.cwnd_inc + factor * sender.cwnd
+
+class AIMD(AdditiveIncrease):
+    name = "AIMD"
+
+class AIAD(AdditiveIncrease):
+    name = "AIAD"
+
+    def leave_slow_start(self, sender):
+        # The original AIAD module never switched to congestion avoidance
+        # (the state was compared instead of assigned). Kept as-is so that
+        # results match the published AIAD graphs.
+        sender.cwnd_inc = 0
+
+class MIAD(MultiplicativeIncrease):
+    name = "MIAD"
+
+class MIMD(MultiplicativeIncrease):
+    name = "MIMD"
+
+class CUBIC(CongestionControl):
+    # CUBIC (RFC 9438). In congestion avoidance the window follows
+    #   W(t) = C * (t - K)^3 + W_max   (in packets, t = time since the last loss)
+    # where W_max is the window at the last loss and K the time it takes to
+    # grow back to W_max. K is computed once per congestion epoch, and the
+    # per-ACK update only needs a few multiplications.
+    name = "CUBIC"
+
+    def __init__(self, C=0.4, beta=0.7, fast_convergence=True, tcp_friendly=True):
+        self.C = C
+        self.beta = beta # multiplicative decrease factor
+        self.fast_convergence = fast_convergence
+        self.tcp_friendly = tcp_friendly
+        # Increase per RTT of a Reno flow with the same average window (the TCP-friendly region)
+        self.alpha = 3 * (1 - beta) / (1 + beta)
+
+        # State of the current congestion epoch (windows in packets)
+        self.w_max = 0.0 # window at the last loss
+        self.epoch_start = None # time of the first ACK after the last loss
+        self.K = 0.0
+        self.origin = 0.0 # plateau of the cubic function
+        self.w_est = 0.0 # estimated window of a Reno flow
+
+    def congestion_avoidance(self, sender):
+        L = sender.data_packet_length
+        now = sender.env.now
+        cwnd = sender.cwnd / L
+        if self.epoch_start is None:
+            # Start a new congestion epoch
+            self.epoch_start = now
+            if cwnd < self.w_max:
+                self.K = ((self.w_max - cwnd) / self.C) ** (1 / 3)
+                self.origin = self.w_max
+            else:
+                self.K = 0.0
+                self.origin = cwnd
+            self.w_est = cwnd
+
+        # Window one RTT from now, on the cubic curve
+        d = now + sender.RTT - self.epoch_start - self.K
+        target = self.origin + self.C * d * d * d
+        segments = sender.acked_segments if sender.byte_counting else 1
+        if self.tcp_friendly:
+            # Never grow slower than Reno would
+            self.w_est += segments * self.alpha / cwnd
+            if self.w_est > target:
+                target = self.w_est
+        if target > cwnd:
+            # At most +50% per RTT
+            if target > 1.5 * cwnd:
+                target = 1.5 * cwnd
+            sender.cwnd = sender.cwnd + segments * L * (target - cwnd) / cwnd
+
+    def ssthresh_after_loss(self, sender):
+        L = sender.data_packet_length
+        cwnd = sender.cwnd / L
+        if self.fast_convergence and cwnd < self.w_max:
+            # The available bandwidth shrank: release some of it to the other flows
+            self.w_max = cwnd * (1 + self.beta) / 2
+        else:
+            self.w_max = cwnd
+        self.epoch_start = None
+        return max(self.beta * cwnd, 2) * L
+
+    def on_timeout(self, sender):
+        ssthresh = self.ssthresh_after_loss(sender)
+        super().on_timeout(sender)
+        sender.ssthresh = ssthresh
+
+class BBR(CongestionControl):
+    # Model-based congestion control in the style of BBR. Instead of reacting
+    # to losses, the strategy estimates the bottleneck bandwidth (the highest
+    # delivery rate of the last bw_window round trips) and the propagation
+    # delay (the lowest RTT of the last min_rtt_window), and sets:
+    #   - the sender's pacing_rate to pacing_gain * bandwidth,
+    #   - its cwnd to cwnd_gain * bandwidth * min RTT (the bandwidth-delay product).
+    # The gains change with the phase:
+    #   STARTUP: 2/ln(2), until the bandwidth stops growing by 25% for 3 round trips
+    #   DRAIN: ln(2)/2, until the packets in flight fit in the bandwidth-delay product
+    #   PROBE_BW: cycles through 1.25, 0.75, 1, 1, 1, 1, 1, 1, one min RTT each
+    #   PROBE_RTT: window of 4 packets for probe_rtt_time, when the min RTT is older than min_rtt_window
+    name = "BBR"
+
+    STARTUP = "STARTUP"
+    DRAIN = "DRAIN"
+    PROBE_BW = "PROBE_BW"
+    PROBE_RTT = "PROBE_RTT"
+    PHASES = (STARTUP, DRAIN, PROBE_BW, PROBE_RTT)
+
+    HIGH_GAIN = 2 / math.log(2)
+    PACING_GAIN_CYCLE = (1.25, 0.75, 1, 1, 1, 1, 1, 1)
+
+    def __init__(self, bw_window=10, min_rtt_window=100, probe_rtt_time=4, cwnd_gain=2):
+        self.bw_window = bw_window # round trips
+        self.min_rtt_window = min_rtt_window
+        self.probe_rtt_time = probe_rtt_time
+        self.cwnd_gain = cwnd_gain
+
+        self.phase = self.STARTUP
+        self.pacing_gain = self.HIGH_GAIN
+
+        # Path model
+        self.bw_samples = deque(maxlen=bw_window) # highest delivery rate of each of the last round trips (bits per unit of time)
+        self.round_bw = 0.0 # highest delivery rate of the current round trip
+        self.btl_bw = 0.0
+        self.min_rtt = float("inf")
+        self.min_rtt_stamp = 0.0
+
+        # Delivery rate sampling: (first sequence number, data delivered, time)
+        # at each ACK, for the packets sent after that ACK
+        self.snapshots = deque()
+
+        # Round trip counting: a round trip ends when the packet that was
+        # next to be sent at its start is acknowledged
+        self.round_end = 0
+
+        # Phase state
+        self.full_bw = 0.0
+        self.full_bw_rounds = 0
+        self.cycle_index = 0
+        self.cycle_stamp = 0.0
+        self.probe_rtt_done = None
+
+    def on_ack(self, sender):
+        now = sender.env.now
+        L = sender.data_packet_length
+        sender.dupACKPackets = 0
+
+        # Min RTT filter
+        min_rtt_expired = now - self.min_rtt_stamp > self.min_rtt_window
+        sample = sender.last_rtt_sample
+        if sample is not None and (sample <= self.min_rtt or min_rtt_expired):
+            self.min_rtt = sample
+            self.min_rtt_stamp = now
+
+        # Delivery rate: data delivered (cumulatively ACKed or SACKed) since the
+        # ACK that preceded the sending of the newest acknowledged packet.
+        # Re-transmitted packets give no sample (sample is None).
+        delivered = sender.sendbase - 1 + len(sender.sacked) * L
+        snapshots = self.snapshots
+        acked = sender.sendbase - L
+        while len(snapshots) > 1 and snapshots[1][0] <= acked:
+            snapshots.popleft()
+        if sample is not None:
+            if snapshots and snapshots[0][0] <= acked and now > snapshots[0][2]:
+                rate = (delivered - snapshots[0][1]) / (now - snapshots[0][2])
+                if rate > self.round_bw:
+                    self.round_bw = rate
+                if rate > self.btl_bw:
+                    self.btl_bw = rate
+        if snapshots and snapshots[-1][0] == sender.nextseqnum:
+            snapshots[-1] = (sender.nextseqnum, delivered, now)
+        else:
+            snapshots.append((sender.nextseqnum, delivered, now))
+
+        # Max bandwidth filter over the last bw_window round trips
+        round_ended = sender.sendbase >= self.round_end
+        if round_ended:
+            self.bw_samples.append(self.round_bw)
+            self.round_bw = 0.0
+            self.btl_bw = max(self.bw_samples)
+            self.round_end = sender.nextseqnum
+
+        if not self.btl_bw:
+            # No bandwidth estimate yet: grow as in slow start
+            sender.cwnd = sender.cwnd + L
+            return
+
+        min_rtt = self.min_rtt if self.min_rtt != float("inf") else sender.RTT
+        bdp = self.btl_bw * min_rtt
+        self.update_phase(sender, now, round_ended, min_rtt_expired, min_rtt, bdp)
+
+        sender.pacing_rate = self.pacing_gain * self.btl_bw
+        if self.phase == self.PROBE_RTT:
+            sender.cwnd = 4 * L
+        else:
+            cwnd_gain = self.HIGH_GAIN if self.phase == self.STARTUP else self.cwnd_gain
+            sender.cwnd = max(cwnd_gain * bdp, 4 * L)
+
+    def update_phase(self, sender, now, round_ended, min_rtt_expired, min_rtt, bdp):
+        if self.phase == self.STARTUP and round_ended:
+            # The pipe is full once the bandwidth stops growing
+            if self.btl_bw >= 1.25 * self.full_bw:
+                self.full_bw = self.btl_bw
+                self.full_bw_rounds = 0
+            else:
+                self.full_bw_rounds += 1
+            if self.full_bw_rounds >= 3:
+                self.phase = self.DRAIN
+                self.pacing_gain = 1 / self.HIGH_GAIN
+        if self.phase == self.DRAIN and sender.nextseqnum - sender.sendbase <= bdp:
+            self.enter_probe_bw(now)
+        elif self.phase == self.PROBE_BW and now - self.cycle_stamp > min_rtt:
+            # Next gain of the cycle
+            self.cycle_index = (self.cycle_index + 1) % len(self.PACING_GAIN_CYCLE)
+            self.cycle_stamp = now
+            self.pacing_gain = self.PACING_GAIN_CYCLE[self.cycle_index]
+
+        if self.phase != self.PROBE_RTT and min_rtt_expired:
+            # Drain the queue to measure the propagation delay again
+            self.phase = self.PROBE_RTT
+            self.pacing_gain = 1
+            self.probe_rtt_done = now + max(self.probe_rtt_time, min_rtt)
+        elif self.phase == self.PROBE_RTT and now >= self.probe_rtt_done:
+            self.min_rtt_stamp = now
+            self.enter_probe_bw(now)
+
+    def enter_probe_bw(self, now):
+        # Start the cycle on a gain of 1, so that probing does not start right away
+        self.phase = self.PROBE_BW
+        self.cycle_index = 2
+        self.cycle_stamp = now
+        self.pacing_gain = self.PACING_GAIN_CYCLE[self.cycle_index]
+
+    def on_dup_ack(self, sender):
+        # Losses do not change the model: only re-transmit
+        sender.dupACKPackets += 1
+        return sender.dupACKPackets == 3
+
+    def on_timeout(self, sender):
+        # Send one packet at a time until the next ACK restores the window
+        sender.cwnd = sender.data_packet_length
+        sender.dupACKPackets = 0
+
+# Registry of the available algorithms, keyed by name
+ALGORITHMS = {}
+
+def register_congestion_control(cls):
+    # Can be used as a class decorator
+    ALGORITHMS[cls.name.upper()] = cls
+    return cls
+
+for _cls in (AIMD, AIAD, MIAD, MIMD, CUBIC, BBR):
+    register_congestion_control(_cls)
+
+def get_congestion_control(name):
+    # Return a new strategy instance for the given algorithm name
+    try:
+        return ALGORITHMS[name.upper()]()
+    except KeyError:
+        raise ValueError("Unknown congestion control algorithm %r (available: %s)" % (name, ", ".join(sorted(ALGORITHMS))))
@@ -0,0 +1,155 @@
+# Vectorized fluid model of the congestion window dynamics.
+#
+# Instead of simulating every packet, the window evolves once per round trip
+# (2 * propagation_delay), for thousands of parameter combinations at once.
+# The update rules are the ones of the packet-level sender
+# (TCP_Protocol.tcp_Sender with the strategies of CongestionControl.py):
+#   - slow start: +packet_length per ACK, switching to congestion avoidance at ssthresh
+#     (except AIAD, which stays in slow start like the packet-level strategy)
+#   - congestion avoidance: +packet_length per window (AIMD, AIAD) or x1.125 per ACK (MIAD, MIMD)
+#   - 3 duplicate ACKs: ssthresh = cwnd / 2 (packet_length if cwnd <= 2 * packet_length), cwnd = ssthresh
+#   - timeout: ssthresh = 0.8 * cwnd, cwnd = packet_length, back to slow start
+#     (after a fixed timeout_value: the RTO is not adapted as in the packet-level sender)
+# and the losses follow the UnreliableChannel rule: every packet is lost when
+# cwnd / RTT > bandwidth, otherwise each packet is lost with probability 0.1.
+#
+# The sender is limited by the sending application, which offers one message
+# per sending_interval, so at most 2 * propagation_delay / sending_interval
+# packets are sent per round trip.
+#
+# CUBIC and BBR are only available in the packet-level simulation.
+#
+# The seed is a parameter like the others: every combination draws its losses
+# from the stream of its own seed (see RandomStreams.py), so its result does
+# not depend on the other combinations it is evaluated with. Combinations with
+# the same seed see the same draws (common random numbers).
+#
+#   result = run_fluid(["AIMD", "MIMD"], bandwidth=[[50], [100]], until=1000, seed=1)
+#   result.throughput  # shape (2, 2)
+
+import numpy
+from RandomStreams import RandomStreams
+from CongestionControl import ALGORITHMS, AIAD, AdditiveIncrease, MultiplicativeIncrease
+
+# Algorithms whose window rules the fluid model implements
+FLUID_ALGORITHMS = sorted(name for name, cls in ALGORITHMS.items() if issubclass(cls, (AdditiveIncrease, MultiplicativeIncrease)))
+
+# Round trips of loss draws taken at once from every seed's stream
+DRAW_BLOCK = 256
+
+class FluidResult(object):
+
+    def __init__(self, shape, time, cwnd, messages_received, packets_sent, retransmissions):
+        self.shape = shape
+        self.time = time # (rounds, *shape) time at the end of each round trip
+        self.cwnd = cwnd # (rounds, *shape) congestion window at the end of each round trip
+        self.messages_received = messages_received
+        self.packets_sent = packets_sent
+        self.retransmissions = retransmissions
+        self.sim_time = time[-1]
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            self.throughput = numpy.where(self.sim_time > 0, messages_received / self.sim_time, 0.0)
+            self.retransmission_pct = numpy.where(packets_sent > 0, retransmissions / packets_sent * 100.0, 0.0)
+
+def run_fluid(algorithm, bandwidth=100, propagation_delay=2, timeout_value=5, packet_length=16,
+              sending_interval=1, RTT=4, until=1000, max_messages=None, seed=None):
+    # Every parameter can be a scalar or an array; they are broadcast together
+    # and each element of the result corresponds to one parameter combination.
+    # RTT is the fixed round trip time the sender reports to the channel.
+    algorithm = numpy.char.upper(numpy.asarray(algorithm).astype(str))
+    unknown = set(numpy.unique(algorithm)) - set(FLUID_ALGORITHMS)
+    if unknown:
+        raise ValueError("Unknown congestion control algorithm(s) %s (available: %s)" % (", ".join(sorted(unknown)), ", ".join(FLUID_ALGORITHMS)))
+    arrays = numpy.broadcast_arrays(algorithm, numpy.asarray(seed, dtype=object), *(numpy.asarray(a, dtype=float) for a in (
+        bandwidth, propagation_delay, timeout_value, packet_length, sending_interval, RTT)))
+    shape = arrays[0].shape
+    algorithm, seed, bandwidth, propagation_delay, timeout_value, L, sending_interval, RTT = (a.ravel() for a in arrays)
+    n = algorithm.size
+
+    # One random stream per distinct seed, shared by the combinations with that seed
+    seeds = {}
+    seed_index = numpy.array([seeds.setdefault(s, len(seeds)) for s in seed], dtype=int)
+    generators = [RandomStreams(None if s is None else int(s)).stream("FLUID").generator for s in seeds]
+
+    # Per-algorithm rules, looked up from the strategy classes
+    multiplicative = numpy.array([issubclass(ALGORITHMS[a], MultiplicativeIncrease) for a in algorithm])
+    stays_in_slow_start = numpy.array([issubclass(ALGORITHMS[a], AIAD) for a in algorithm])
+
+    # Congestion state of every combination
+    cwnd = L.copy()
+    ssthresh = numpy.full(n, numpy.inf)
+    slow_start = numpy.ones(n, dtype=bool)
+    now = numpy.zeros(n)
+    delivered_total = numpy.zeros(n)
+    sent_total = numpy.zeros(n)
+    retransmissions = numpy.zeros(n)
+
+    round_trip = 2 * propagation_delay
+    app_limit = numpy.maximum(numpy.floor(round_trip / sending_interval), 1)
+
+    times = [now.copy()]
+    cwnds = [cwnd.copy()]
+    active = now < until
+    rounds = 0
+    while active.any():
+        previous = cwnd, ssthresh, slow_start
+        if rounds % DRAW_BLOCK == 0:
+            draws = numpy.stack([generator.geometric(0.1, DRAW_BLOCK) for generator in generators])
+        geometric = draws[seed_index, rounds % DRAW_BLOCK]
+        rounds += 1
+
+        # Packets sent in this round trip
+        sent = numpy.maximum(numpy.minimum(numpy.floor(cwnd / L), app_limit), 1)
+
+        # Losses, following the UnreliableChannel rule
+        Pl = numpy.where(cwnd / RTT > bandwidth, 1.0, 0.1)
+        first_loss = numpy.where(Pl >= 1.0, 0, geometric - 1) # packets delivered before the first loss
+        lost = first_loss < sent
+        # 3 duplicate ACKs need 3 packets delivered after the lost one
+        fast = lost & (Pl < 1.0) & (sent - first_loss - 1 >= 3)
+        timeout = lost & ~fast
+        ok = ~lost
+
+        # Window growth on a loss-free round trip
+        grow_ss = ok & slow_start
+        cwnd = numpy.where(grow_ss, cwnd + L * sent, cwnd)
+        leave = grow_ss & (cwnd >= ssthresh) & ~stays_in_slow_start
+        grow_ca = ok & ~slow_start
+        cwnd = numpy.where(grow_ca & multiplicative, cwnd * 1.125 ** sent, cwnd)
+        cwnd = numpy.where(grow_ca & ~multiplicative, cwnd + L * sent * L / cwnd, cwnd)
+        slow_start = slow_start & ~leave
+
+        # Fast retransmit and recovery
+        half = numpy.where(cwnd <= 2 * L, L, cwnd / 2)
+        ssthresh = numpy.where(fast, half, ssthresh)
+        cwnd = numpy.where(fast, half, cwnd)
+        slow_start = slow_start & ~fast
+
+        # Timeout: go back to slow start and re-send the whole window
+        ssthresh = numpy.where(timeout, 0.8 * cwnd, ssthresh)
+        cwnd = numpy.where(timeout, L, cwnd)
+        slow_start = slow_start | timeout
+
+        # Combinations that already reached the end of their run keep their state
+        cwnd, ssthresh, slow_start = (numpy.where(active, new, old) for new, old in zip((cwnd, ssthresh, slow_start), previous))
+
+        delivered = numpy.where(timeout, first_loss, sent)
+        delivered_total += numpy.where(active, delivered, 0)
+        sent_total += numpy.where(active, sent + fast, 0)
+        retransmissions += numpy.where(active, numpy.where(timeout, sent - first_loss, fast), 0)
+        now = numpy.where(active, now + round_trip + numpy.where(timeout, timeout_value, 0), now)
+
+        times.append(now.copy())
+        cwnds.append(cwnd.copy())
+        active = now < until
+        if max_messages is not None:
+            active &= delivered_total < max_messages
+
+    return FluidResult(
+        shape,
+        numpy.array(times).reshape((-1,) + shape),
+        numpy.array(cwnds).reshape((-1,) + shape),
+        delivered_total.reshape(shape),
+        sent_total.reshape(shape),
+        retransmissions.reshape(shape),
+    )
@@ -0,0 +1,205 @@
+# Lightweight discrete-event kernel, as an alternative backend to SimPy.
+#
+# The kernel is a binary heap of (time, priority, id, callback, args)
+# entries. Plain callbacks are scheduled directly with call_later(), without
+# any event object, and the subset of the SimPy API used by the simulation
+# components is provided on top of it:
+#   - env.now, env.run(until), env.peek(), env.step()
+#   - env.event() (with succeed(), triggered, callbacks), env.timeout(delay)
+#   - env.process(generator) for generator-based processes
+# Events are processed in the same order as in SimPy (by time, then
+# priority, then scheduling order).
+#
+# SimPyEnvironment is the adapter for the SimPy backend: a simpy.Environment
+# with the same call_later() method, which counts the events it processes in
+# events_processed like the kernel. The components schedule their plain
+# delays with call_later(), so they run on either backend:
+#
+#   env = make_environment("kernel")  # or "simpy"
+#   sim = Simulation(algorithm="AIMD", env=env)
+#
+# The kernel missed its target of 5-10x more events/sec than SimPy: it is
+# only about 1.2-1.3x faster. With python -m benchmark --packets 20000
+# --algorithm AIMD --backend simpy kernel:
+#   - 1 flow:   SimPy 118k events/s (31k packets/s), kernel 136k events/s (36k packets/s)
+#   - 10 flows: SimPy 123k events/s (29k packets/s), kernel 159k events/s (37k packets/s)
+# Under cProfile, the kernel's own code is about 22% of the run time. The rest is
+# the protocol, channel and metrics code, so a faster event loop alone cannot
+# reach the target.
+#
+# The kernel is kept as an opt-in backend (SimPy stays the default) because:
+#   - the 20-30% it saves adds up over long sweeps (tcpsim --backend kernel)
+#   - it costs little to keep: the components only depend on call_later() and
+#     the SimPy subset above, which SimPyEnvironment provides as well
+#   - tests/test_kernel.py runs every feature (applications, workloads, delayed
+#     ACKs, batch delivery, drop policies, steady-state stop) on both backends
+#     and requires identical results, so the two cannot drift apart
+
+import itertools
+from heapq import heappush, heappop
+import simpy
+
+# Priorities of the scheduled entries (as in SimPy)
+URGENT = 0
+NORMAL = 1
+
+PENDING = object() # value of the events that have not been triggered
+
+class StopSimulation(Exception):
+    pass
+
+class Event(object):
+    __slots__ = ("env", "callbacks", "_value")
+
+    def __init__(self, env):
+        self.env = env
+        self.callbacks = [] # None once the event has been processed
+        self._value = PENDING
+
+    @property
+    def triggered(self):
+        return self._value is not PENDING
+
+    @property
+    def processed(self):
+        return self.callbacks is None
+
+    @property
+    def value(self):
+        if self._value is PENDING:
+            raise AttributeError("Value of %r is not yet available" % self)
+        return self._value
+
+    def succeed(self, value=None):
+        if self._value is not PENDING:
+            raise RuntimeError("%r has already been triggered" % self)
+        self._value = value
+        env = self.env
+        heappush(env.queue, (env.now, NORMAL, next(env.eid), self.process, ()))
+        return self
+
+    def process(self):
+        # Run the callbacks of the event
+        callbacks, self.callbacks = self.callbacks, None
+        for callback in callbacks:
+            callback(self)
+
+class Timeout(Event):
+    __slots__ = ()
+
+    def __init__(self, env, delay, value=None):
+        if delay < 0:
+            raise ValueError("Negative delay %s" % delay)
+        self.env = env
+        self.callbacks = []
+        self._value = value
+        heappush(env.queue, (env.now + delay, NORMAL, next(env.eid), self.process, ()))
+
+class Process(Event):
+    __slots__ = ("generator",)
+
+    def __init__(self, env, generator):
+        Event.__init__(self, env)
+        self.generator = generator
+        # Start the process before the regular events of the current time
+        heappush(env.queue, (env.now, URGENT, next(env.eid), self.resume, (None,)))
+
+    def resume(self, event):
+        # Send the value of "event" into the generator, until it yields an
+        # event that has not been processed yet
+        value = None if event is None else event._value
+        while True:
+            try:
+                target = self.generator.send(value)
+            except StopIteration as stop:
+                self.succeed(stop.value)
+                return
+            if target.callbacks is not None:
+                target.callbacks.append(self.resume)
+                return
+            value = target._value
+
+class Environment(object):
+
+    def __init__(self, initial_time=0):
+        self.now = initial_time
+        self.queue = [] # heap of (time, priority, id, callback, args)
+        self.eid = itertools.count()
+        self.events_processed = 0
+
+    def call_later(self, delay, callback, *args):
+        # Call callback(*args) after "delay" amount of time
+        heappush(self.queue, (self.now + delay, NORMAL, next(self.eid), callback, args))
+
+    def event(self):
+        return Event(self)
+
+    def timeout(self, delay, value=None):
+        return Timeout(self, delay, value)
+
+    def process(self, generator):
+        return Process(self, generator)
+
+    def peek(self):
+        # Time of the next scheduled entry
+        return self.queue[0][0] if self.queue else float("inf")
+
+    def step(self):
+        self.now, _, _, callback, args = heappop(self.queue)
+        callback(*args)
+        self.events_processed += 1
+
+    def run(self, until=None):
+        # Same semantics as simpy.Environment.run(): until can be None, a time or an event
+        if until is not None:
+            if not isinstance(until, Event):
+                at = float(until)
+                if at <= self.now:
+                    raise ValueError("until (%s) must be greater than the current simulation time" % at)
+                # Stop before the regular events at time "at"
+                until = Event(self)
+                until._value = None
+                heappush(self.queue, (at, URGENT, next(self.eid), until.process, ()))
+            elif until.callbacks is None:
+                # Already processed
+                return until._value
+            until.callbacks.append(self.stop)
+
+        # (events_processed is kept up to date, for the live metrics)
+        queue = self.queue
+        try:
+            while queue:
+                self.now, _, _, callback, args = heappop(queue)
+                self.events_processed += 1
+                callback(*args)
+        except StopSimulation as stop:
+            return stop.args[0]
+        if until is not None:
+            raise RuntimeError('No scheduled events left but "until" event was not triggered: %r' % until)
+
+    @staticmethod
+    def stop(event):
+        raise StopSimulation(event._value)
+
+class SimPyEnvironment(simpy.Environment):
+    # SimPy backend, with the call_later() method and the event count of the kernel
+
+    def __init__(self, initial_time=0):
+        super().__init__(initial_time)
+        self.events_processed = 0
+
+    def step(self):
+        # simpy.Environment.run() processes every event through step()
+        self.events_processed += 1
+        super().step()
+
+    def call_later(self, delay, callback, *args):
+        self.timeout(delay).callbacks.append(lambda event: callback(*args))
+
+BACKENDS = {"simpy": SimPyEnvironment, "kernel": Environment}
+
+def make_environment(backend="simpy"):
+    try:
+        return BACKENDS[backend.lower()]()
+    except KeyError:
+        raise ValueError("Unknown simulation backend %r (available: %s)" % (backend, ", ".join(sorted(BACKENDS))))
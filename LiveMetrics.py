@@ -0,0 +1,218 @@
+# Live metrics of a running simulation, in the Prometheus text format.
+#
+# A sampling process reads the state of the simulation every "interval" of
+# simulated time, and at most once every "wall_interval" seconds of
+# wall-clock time it renders the metrics:
+#   - tcpsim_cwnd, tcpsim_ssthresh, tcpsim_packets_in_flight (per flow)
+#   - tcpsim_state (per flow, for the loss-based algorithms), or tcpsim_phase
+#     for the model-based ones (BBR) that have phases instead of a TCP state
+#   - tcpsim_packets_sent_total, tcpsim_retransmissions_total, tcpsim_messages_received_total (per flow)
+#   - tcpsim_channel_utilization (per channel)
+#   - tcpsim_sim_time, tcpsim_sim_time_per_second, tcpsim_events_per_second
+# The simulation never waits for the server: a scrape returns the latest
+# rendered text, served by a thread over local HTTP or a Unix socket:
+#
+#   metrics = LiveMetrics(labels={"run": "aimd-1"})
+#   metrics.serve_http(port=9100)  # or metrics.serve_unix("/tmp/tcpsim.sock")
+#   metrics.attach(sim)
+#   sim.run(until=100000)
+#
+#   curl http://127.0.0.1:9100/metrics
+#   curl --unix-socket /tmp/tcpsim.sock http://localhost/metrics
+
+import os
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from CongestionControl import SLOW_START, CONGESTION_AVOIDANCE, FAST_RECOVERY
+
+STATES = {SLOW_START: "slow_start", CONGESTION_AVOIDANCE: "congestion_avoidance", FAST_RECOVERY: "fast_recovery"}
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Name, type and help of every metric
+METRICS = (
+    ("tcpsim_cwnd", "gauge", "Congestion window (bits)"),
+    ("tcpsim_ssthresh", "gauge", "Slow start threshold (bits)"),
+    ("tcpsim_state", "gauge", "Congestion control state (1 for the current state)"),
+    ("tcpsim_phase", "gauge", "Phase of a model-based congestion control (1 for the current phase)"),
+    ("tcpsim_packets_in_flight", "gauge", "Packets sent and not yet acknowledged"),
+    ("tcpsim_packets_sent_total", "counter", "DATA packets sent, including re-transmissions"),
+    ("tcpsim_retransmissions_total", "counter", "DATA packets re-transmitted"),
+    ("tcpsim_messages_received_total", "counter", "Messages delivered to the receiving application"),
+    ("tcpsim_channel_utilization", "gauge", "Fraction of the time the channel was transmitting"),
+    ("tcpsim_sim_time", "gauge", "Current simulation time"),
+    ("tcpsim_sim_time_per_second", "gauge", "Simulation time advanced per second of wall-clock time"),
+    ("tcpsim_events_per_second", "gauge", "Events processed per second of wall-clock time"),
+)
+
+def format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if value == float("-inf"):
+        return "-Inf"
+    if value != value:
+        return "NaN"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for value in labels.values())
+    return "{" + ",".join('%s="%s"' % (name, value) for name, value in zip(labels, escaped)) + "}"
+
+def flows(sim):
+    # (sender, receiving application) of every flow of a Simulation or MultiFlowSimulation
+    if hasattr(sim, "flows"):
+        return [(sender, receiving_app) for _, sender, _, receiving_app in sim.flows]
+    return [(sim.tcp_sender, sim.receiving_app)]
+
+def channels(sim):
+    if hasattr(sim, "link"):
+        return [sim.link] + [receiver.channel for _, _, receiver, _ in sim.flows]
+    return [sim.channel_for_data, sim.channel_for_ack]
+
+class LiveMetrics(object):
+
+    def __init__(self, labels=None, interval=1, wall_interval=1.0):
+        # labels: added to every series (e.g. the configuration of the run)
+        # interval: simulation time between two samples
+        # wall_interval: minimum wall-clock time between two renderings
+        self.labels = dict(labels or {})
+        self.interval = interval
+        self.wall_interval = wall_interval
+        self.sim = None
+        self.text = "" # latest rendering, served as is
+        self.server = None
+        self.thread = None
+        self._last = None # (wall-clock time, simulation time, events processed) at the previous rendering
+
+    def attach(self, sim, labels=None):
+        # Start sampling a simulation (replacing the previous one)
+        if labels is not None:
+            self.labels = dict(labels)
+        self.sim = sim
+        self._last = None
+        self.update()
+        sim.env.process(self.sampling(sim))
+
+    def sampling(self, sim):
+        # Sampling process, until another simulation is attached
+        yield sim.env.timeout(self.interval)
+        while self.sim is sim:
+            if time.perf_counter() - self._last[0] >= self.wall_interval:
+                self.update()
+            yield sim.env.timeout(self.interval)
+
+    def update(self):
+        # Render the current state of the simulation
+        sim = self.sim
+        env = sim.env
+        now = env.now
+        wall = time.perf_counter()
+        events = getattr(env, "events_processed", None)
+        samples = {name: [] for name, _, _ in METRICS}
+
+        for flow, (sender, receiving_app) in enumerate(flows(sim)):
+            labels = dict(self.labels, flow=flow, algorithm=sender.congestion_control.name)
+            samples["tcpsim_cwnd"].append((labels, sender.cwnd))
+            samples["tcpsim_ssthresh"].append((labels, sender.ssthresh))
+            phases = getattr(sender.congestion_control, "PHASES", None)
+            if phases is not None:
+                for phase in phases:
+                    samples["tcpsim_phase"].append((dict(labels, phase=phase.lower()), int(sender.congestion_control.phase == phase)))
+            else:
+                for state, state_name in STATES.items():
+                    samples["tcpsim_state"].append((dict(labels, state=state_name), int(sender.state == state)))
+            samples["tcpsim_packets_in_flight"].append((labels, (sender.nextseqnum - sender.sendbase) // sender.data_packet_length))
+            samples["tcpsim_packets_sent_total"].append((labels, sender.total_packets_sent))
+            samples["tcpsim_retransmissions_total"].append((labels, sender.num_retransmissions))
+            samples["tcpsim_messages_received_total"].append((labels, receiving_app.total_messages_received))
+        for channel in channels(sim):
+            samples["tcpsim_channel_utilization"].append((dict(self.labels, channel=channel.name),
+                                                          channel.channel_utilization_time / now if now else 0.0))
+
+        samples["tcpsim_sim_time"].append((self.labels, now))
+        if self._last is not None and wall > self._last[0]:
+            elapsed = wall - self._last[0]
+            samples["tcpsim_sim_time_per_second"].append((self.labels, (now - self._last[1]) / elapsed))
+            if events is not None:
+                samples["tcpsim_events_per_second"].append((self.labels, (events - self._last[2]) / elapsed))
+        self._last = (wall, now, events)
+
+        lines = []
+        for name, kind, help_text in METRICS:
+            if not samples[name]:
+                continue
+            lines.append("# HELP %s %s" % (name, help_text))
+            lines.append("# TYPE %s %s" % (name, kind))
+            for labels, value in samples[name]:
+                lines.append("%s%s %s" % (name, format_labels(labels), format_value(value)))
+        self.text = "\n".join(lines) + "\n"
+
+    # Functions for serving the metrics from a background thread
+    def serve_http(self, host="127.0.0.1", port=9100):
+        # Serve on http://host:port/metrics (port 0 picks a free port, see self.address)
+        self.start(ThreadingHTTPServer((host, port), self.handler()))
+        return self.server.server_address
+
+    def serve_unix(self, path):
+        # Serve HTTP over a Unix socket
+        if os.path.exists(path):
+            os.remove(path)
+        self.start(UnixHTTPServer(path, self.handler()))
+        return path
+
+    @property
+    def address(self):
+        return self.server.server_address if self.server is not None else None
+
+    def handler(self):
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = metrics.text.encode()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # Keep the output of the simulation clean
+                pass
+
+        return MetricsHandler
+
+    def start(self, server):
+        self.close()
+        self.server = server
+        self.thread = threading.Thread(target=server.serve_forever, name="LiveMetrics", daemon=True)
+        self.thread.start()
+
+    def close(self):
+        if self.server is None:
+            return
+        self.server.shutdown()
+        self.server.server_close()
+        if isinstance(self.server, UnixHTTPServer):
+            try:
+                os.remove(self.server.server_address)
+            except FileNotFoundError:
+                pass
+        self.server = None
+        self.thread = None
+
+class UnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        # BaseHTTPRequestHandler expects a (host, port) client address
+        request, _ = super().get_request()
+        return request, ("local", 0)
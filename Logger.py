@@ -0,0 +1,91 @@
+# Leveled event logger shared by the channel, the applications and the
+# TCP sender/receiver.
+#
+# Every simulation event is logged as a (level, time, source, event, fields)
+# record and handed to one or more sinks:
+#   - TextSink writes a human-readable line per event (stdout by default)
+#   - NDJSONSink writes one JSON object per line to a buffered file
+#
+# Call sites check the level flag before building the record, so a disabled
+# level costs a single attribute lookup and no string formatting:
+#
+#   if logger.info:
+#       logger.log(INFO, self.env.now, self.name, "udt_send", seq_num=packt.seq_num)
+
+import sys
+import json
+
+# Log levels
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+OFF = 100
+
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+
+class TextSink(object):
+
+    def __init__(self, stream=None):
+        # None means the current sys.stdout, looked up on every write
+        self.stream = stream
+
+    def write(self, level, time, source, event, fields):
+        line = "TIME: %s %s: %s" % (time, source, event)
+        if fields:
+            line += " " + " ".join("%s=%s" % item for item in fields.items())
+        (self.stream or sys.stdout).write(line + "\n")
+
+    def close(self):
+        (self.stream or sys.stdout).flush()
+
+class NDJSONSink(object):
+
+    def __init__(self, path, buffer_size=1 << 20):
+        # Writes go through a large buffer and reach the disk in chunks
+        self.file = open(path, "w", buffering=buffer_size)
+
+    def write(self, level, time, source, event, fields):
+        record = {"time": time, "level": LEVEL_NAMES.get(level, level), "source": source, "event": event}
+        record.update(fields)
+        self.file.write(json.dumps(record, default=str) + "\n")
+
+    def close(self):
+        self.file.close()
+
+class EventLogger(object):
+
+    def __init__(self, level=DEBUG, sinks=None):
+        self.sinks = [TextSink()] if sinks is None else list(sinks)
+        self.set_level(level)
+
+    def set_level(self, level):
+        # Cache one flag per level so call sites can skip disabled events cheaply
+        self.level = level
+        self.debug = level <= DEBUG
+        self.info = level <= INFO
+        self.warning = level <= WARNING
+        self.error = level <= ERROR
+
+    def log(self, level, time, source, event, **fields):
+        if level < self.level:
+            return
+        for sink in self.sinks:
+            sink.write(level, time, source, event, fields)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+# The logger shared by all the simulation components
+logger = EventLogger()
+
+def configure(level=None, sinks=None):
+    # Reconfigure the shared logger in place, so that modules which
+    # imported it keep using the same object.
+    if sinks is not None:
+        logger.close()
+        logger.sinks = list(sinks)
+    if level is not None:
+        logger.set_level(level)
+    return logger
@@ -0,0 +1,135 @@
+# Time-series recorder for the simulation metrics (congestion window,
+# bandwidth utilization, ...).
+#
+# Samples are appended to growable array('d') columns, so recording does not
+# allocate a Python object per sample. The recorder supports the following
+# modes:
+#   - "all": keep every sample (an exact trace, including samples taken at the same time)
+#   - "every_n": keep one sample out of every "every" samples
+#   - "bucket": aggregate samples into time buckets of width "bucket",
+#               keeping the min, max, mean and count of each bucket
+#   - "reservoir": keep a uniform random sample of at most "capacity" samples
+#
+# The columns can be exported to numpy without copying, or written to CSV
+# (or Parquet, if pyarrow is installed).
+
+import csv
+import random
+from array import array
+
+MODES = ("all", "every_n", "bucket", "reservoir")
+
+class TimeSeries(object):
+
+    def __init__(self, mode="all", every=1, bucket=1.0, capacity=10000, seed=None):
+        if mode not in MODES:
+            raise ValueError("Unknown recording mode %r (available: %s)" % (mode, ", ".join(MODES)))
+        if mode == "every_n" and every < 1:
+            raise ValueError("every must be at least 1")
+        if mode == "bucket" and bucket <= 0:
+            raise ValueError("bucket must be positive")
+        if mode == "reservoir" and capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.mode = mode
+        self.every = every
+        self.bucket = bucket
+        self.capacity = capacity
+        self.num_samples = 0 # number of samples offered to the recorder
+
+        if mode == "bucket":
+            self.columns = {name: array("d") for name in ("time", "min", "max", "mean", "count")}
+            # Aggregates of the bucket currently being filled
+            self._bucket_index = None
+            self._min = self._max = self._sum = 0.0
+            self._count = 0
+        else:
+            self.columns = {"time": array("d"), "value": array("d")}
+        if mode == "reservoir":
+            self._rng = random.Random(seed)
+
+        # Select the recording function once, instead of on every sample
+        self.record = getattr(self, "_record_" + mode)
+
+    def _record_all(self, time, value):
+        self.num_samples += 1
+        self.columns["time"].append(time)
+        self.columns["value"].append(value)
+
+    def _record_every_n(self, time, value):
+        if self.num_samples % self.every == 0:
+            self.columns["time"].append(time)
+            self.columns["value"].append(value)
+        self.num_samples += 1
+
+    def _record_bucket(self, time, value):
+        self.num_samples += 1
+        index = int(time // self.bucket)
+        if index != self._bucket_index:
+            self._flush_bucket()
+            self._bucket_index = index
+            self._min = self._max = self._sum = value
+            self._count = 1
+            return
+        if value < self._min:
+            self._min = value
+        elif value > self._max:
+            self._max = value
+        self._sum += value
+        self._count += 1
+
+    def _flush_bucket(self):
+        if self._count == 0:
+            return
+        columns = self.columns
+        columns["time"].append(self._bucket_index * self.bucket)
+        columns["min"].append(self._min)
+        columns["max"].append(self._max)
+        columns["mean"].append(self._sum / self._count)
+        columns["count"].append(self._count)
+        self._count = 0
+
+    def _record_reservoir(self, time, value):
+        # Algorithm R: the n-th sample replaces a random slot with probability capacity/n
+        self.num_samples += 1
+        if self.num_samples <= self.capacity:
+            self.columns["time"].append(time)
+            self.columns["value"].append(value)
+        else:
+            slot = self._rng.randrange(self.num_samples)
+            if slot < self.capacity:
+                self.columns["time"][slot] = time
+                self.columns["value"][slot] = value
+
+    def __len__(self):
+        return len(self.columns["time"]) + (1 if self.mode == "bucket" and self._count else 0)
+
+    def finish(self):
+        # Close the bucket being filled and put the reservoir back in time order.
+        # Called by the export functions; recording may continue afterwards.
+        if self.mode == "bucket":
+            self._flush_bucket()
+            self._bucket_index = None
+        elif self.mode == "reservoir":
+            order = sorted(range(len(self.columns["time"])), key=self.columns["time"].__getitem__)
+            for name, column in self.columns.items():
+                self.columns[name] = array("d", (column[i] for i in order))
+        return self.columns
+
+    def to_numpy(self):
+        # Returns a dict of numpy arrays sharing memory with the recorder.
+        # The arrays must be released before recording more samples.
+        import numpy
+        return {name: numpy.frombuffer(column, dtype=numpy.float64) for name, column in self.finish().items()}
+
+    def to_csv(self, path):
+        columns = self.finish()
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(list(columns))
+            writer.writerows(zip(*columns.values()))
+
+    def to_parquet(self, path):
+        import pyarrow
+        import pyarrow.parquet
+        table = pyarrow.table(self.to_numpy())
+        pyarrow.parquet.write_table(table, path)
@@ -5,14 +5,20 @@
 #   payload: the data contained in the packet,
 #   packet_length: length of the entire packet (in bits),
 #   seq_num: the packet sequence number,
+#   sack: for ACK packets, the SACK blocks ((start, end) sequence number ranges
+#         received beyond seq_num), empty by default
+#   window: for ACK packets, the receive window advertised by the receiver
+#           (in bits, from seq_num on), None if not advertised
+#
+# Packets are immutable tuples without a per-instance __dict__, so they
+# can be shared freely between the sender buffer, the channel and the
+# receiver without making copies.
+
+from collections import namedtuple
+
+class Packet(namedtuple("Packet", ["payload", "packet_length", "seq_num", "sack", "window"], defaults=((), None))):
 
-class Packet(object):
-    
-    def __init__(self, payload, packet_length, seq_num):
-        # Initialize the packet's payload, packet length, and sequence number
-        self.payload = payload
-        self.packet_length = packet_length
-        self.seq_num = seq_num
+    __slots__ = ()
 
     # This function can be used to print a packet
     def __str__(self):
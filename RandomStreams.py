@@ -0,0 +1,57 @@
+# Reproducible random number streams for the simulation components.
+#
+# Every channel (and any other component that needs random numbers) owns its
+# own stream, derived from one root seed with numpy's SeedSequence:
+#   - runs with the same root seed are reproducible,
+#   - runs with different root seeds are statistically independent,
+#   - a stream depends only on the root seed and on its name, so two runs
+#     with the same seed (e.g. AIMD and MIMD) see the same loss draws on
+#     "DATA_CHANNEL" (common random numbers).
+#
+# The uniform numbers are drawn from numpy in blocks, instead of one Python
+# call into the random module per packet.
+#
+#   streams = RandomStreams(seed=1)
+#   channel = UnreliableChannel(env, "DATA_CHANNEL", 2, 1000, 100, rng=streams.stream("DATA_CHANNEL"))
+
+import math
+import zlib
+import numpy
+
+class UniformStream(object):
+    # Uniform numbers in [0, 1), pre-drawn in blocks of "block_size"
+
+    def __init__(self, generator, block_size=4096):
+        self.generator = generator
+        self.block_size = block_size
+        self.block = []
+        self.index = 0
+
+    def random(self):
+        if self.index == len(self.block):
+            self.block = self.generator.random(self.block_size).tolist()
+            self.index = 0
+        value = self.block[self.index]
+        self.index += 1
+        return value
+
+    # Same distributions as the random module, by inversion of the uniform numbers
+    def expovariate(self, lambd):
+        return -math.log(1.0 - self.random()) / lambd
+
+    def paretovariate(self, alpha):
+        return (1.0 - self.random()) ** (-1.0 / alpha)
+
+class RandomStreams(object):
+
+    def __init__(self, seed=None, block_size=4096):
+        # With seed=None, fresh entropy is used (available as self.entropy)
+        self.seed_sequence = numpy.random.SeedSequence(seed)
+        self.entropy = self.seed_sequence.entropy
+        self.block_size = block_size
+
+    def stream(self, name):
+        # The stream for "name" is the same every time for a given root seed
+        key = zlib.crc32(name.encode("utf-8"))
+        child = numpy.random.SeedSequence(self.entropy, spawn_key=(key,))
+        return UniformStream(numpy.random.Generator(numpy.random.PCG64(child)), self.block_size)
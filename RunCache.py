@@ -0,0 +1,195 @@
+# On-disk cache of run results, for re-running parameter sweeps.
+#
+# A run result (the summary dict of a run; traces are never cached) is
+# stored under a key hashing:
+#   - the full configuration of the run, with its integral floats normalised
+#     to ints (so that bandwidth=100 and bandwidth=100.0 share a key, while
+#     large ints such as 2**53 and 2**53 + 1 keep their exact values)
+#   - the source of the modules the packet-level simulation is made of
+#     (protocol, channel, applications, ...) and of the function tcpsim runs
+#     every configuration with (tcpsim.run_config)
+#   - the source of the run's congestion control class and of its base classes
+# so that changing one algorithm only invalidates the runs of that algorithm.
+# The contents of a trace workload's file are part of the key too. The
+# recording options and the trace directory are part of the configuration,
+# so they are hashed as well: runs that only differ by them are cached apart
+# (even though their summaries are the same).
+#
+# Every entry is a pickle file, written to a temporary file and renamed into
+# place, so that several processes (the workers of a process pool, or
+# concurrent sweeps) can share a cache directory. Reading an entry marks it as
+# recently used, and evict() removes the least recently used entries until
+# the cache fits in max_bytes:
+#
+#   cache = RunCache(".tcpsim-cache", max_bytes=2**30)
+#   key = cache.key(config)
+#   result = cache.get(key)
+#   if result is None:
+#       result = run_config(config)
+#       cache.put(key, result)
+#   cache.evict()
+
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import tempfile
+import time
+from functools import lru_cache
+
+# Modules whose source determines the results of a packet-level run
+SIMULATION_MODULES = ["TCP_Protocol", "Channel", "Packet", "Applications", "Workload",
+                      "RandomStreams", "Kernel", "Simulation", "SteadyState"]
+
+# (module, function) running a configuration and building its result
+RUNNERS = [("tcpsim", "run_config")]
+
+@lru_cache(maxsize=None)
+def code_version():
+    # Hash of the source of the simulation modules and of the runners
+    digest = hashlib.sha256()
+    for name in SIMULATION_MODULES:
+        module = __import__(name)
+        with open(module.__file__, "rb") as f:
+            digest.update(f.read())
+    for name, function in RUNNERS:
+        digest.update(inspect.getsource(getattr(__import__(name), function)).encode())
+    return digest.hexdigest()
+
+@lru_cache(maxsize=None)
+def algorithm_version(algorithm):
+    # Hash of the source of a congestion control class and of its base classes
+    from CongestionControl import ALGORITHMS
+    digest = hashlib.sha256()
+    for cls in ALGORITHMS[algorithm.upper()].__mro__:
+        if cls is not object:
+            digest.update(inspect.getsource(cls).encode())
+    return digest.hexdigest()
+
+def normalize(value):
+    # Configuration with every integral float as an int. Ints keep their exact
+    # value (a float cannot tell 2**53 from 2**53 + 1), as do booleans and
+    # the other floats.
+    if isinstance(value, dict):
+        return {key: normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize(item) for item in value]
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+def file_version(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class RunCache(object):
+
+    def __init__(self, directory, max_bytes=2**30):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, config):
+        # Content address of the result of a run with this configuration
+        identity = {"config": normalize(config), "code": code_version(), "algorithm": algorithm_version(config["algorithm"])}
+        params = config.get("workload_params") or {}
+        if config.get("workload") == "trace" and "path" in params:
+            identity["trace"] = file_version(params["path"])
+        text = json.dumps(identity, sort_keys=True, default=repr)
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".pkl")
+
+    def get(self, key):
+        # The cached result, or None
+        path = self.path(key)
+        try:
+            with open(path, "rb") as f:
+                result = pickle.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            # Unreadable entry (e.g. written by an incompatible version): drop it
+            self.discard(path)
+            self.misses += 1
+            return None
+        # Mark the entry as recently used (unless it was evicted meanwhile)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        self.hits += 1
+        return result
+
+    def put(self, key, result):
+        # Atomic write: readers see either no entry or the complete one
+        path = self.path(key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except BaseException:
+            self.discard(tmp_path)
+            raise
+
+    def entries(self, stale_after=None):
+        # (last use, size, path) of every entry.
+        # With stale_after, temporary files older than that many seconds
+        # (left by killed writers) are removed on the way.
+        entries = []
+        for dirpath, _, filenames in os.walk(self.directory):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                if name.endswith(".tmp") and stale_after is not None:
+                    try:
+                        if os.stat(path).st_mtime < time.time() - stale_after:
+                            self.discard(path)
+                    except FileNotFoundError:
+                        pass
+                    continue
+                if not name.endswith(".pkl"):
+                    continue
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        # Remove the least recently used entries until the cache fits in max_bytes.
+        # Returns the number of entries removed.
+        entries = sorted(self.entries(stale_after=3600))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self.discard(path)
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        for _, _, path in self.entries():
+            self.discard(path)
+
+    @staticmethod
+    def discard(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
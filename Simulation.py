@@ -0,0 +1,274 @@
+# Builds the simulation topology used by the Testbench:
+#
+#   SendingApplication -> tcp_Sender -> DATA_CHANNEL -> tcp_Receiver -> ReceivingApplication
+#                             ^                              |
+#                             +-------- ACK_CHANNEL <--------+
+#
+# and runs it until a time limit or a number of delivered messages,
+# returning the statistics printed by the Testbench as a dictionary.
+#
+# MultiFlowSimulation connects N such flows through a shared BottleneckLink.
+#
+# With a "backlog", the flows are driven by a BulkSendingApplication with a
+# send queue of that many messages (always full when sending_interval is None),
+# optionally shaped by a token bucket of token_rate messages per unit of time.
+# With a "workload" (a name of Workload.WORKLOADS, with its parameters in
+# workload_params), the messages arrive according to that traffic model.
+#
+# "recording" gives the TimeSeries options of the cwnd and utilization series
+# (see Metrics.py), e.g. {"mode": "reservoir", "capacity": 1000} to bound
+# their memory in long runs; by default every sample is kept.
+#
+# "rcv_window" is the receive window of the receivers, in packets: they
+# buffer that many out-of-order packets and advertise it in their ACKs.
+#
+# With ack_every > 1, the receivers delay their ACKs (one every ack_every
+# in-order packets, or after ack_delay) and the senders use byte counting.
+# With batch_delivery, the channels hand the packets arriving together to the
+# other end at once, and the receivers acknowledge them with one cumulative
+# ACK (the senders use byte counting too).
+#
+# With a "trace" directory, the channels and the sender record every
+# per-packet event in a columnar trace (see Trace.py), flushed at the end of
+# every run() and closed by close().
+#
+# The configuration (self.config, reported with the results of summary())
+# holds every constructor argument but env.
+#
+# The simulations run on the SimPy backend by default, or on the lightweight
+# event kernel with backend="kernel" (see Kernel.py).
+
+from Kernel import make_environment
+from RandomStreams import RandomStreams
+from Applications import SendingApplication, BulkSendingApplication, ReceivingApplication
+from Workload import WORKLOADS
+from Channel import UnreliableChannel
+from Bottleneck import BottleneckLink, jain_fairness
+from TCP_Protocol import tcp_Sender, tcp_Receiver
+from Trace import TraceWriter
+
+def sending_application(env, sending_interval, backlog, token_rate, bucket_size, workload=None, workload_params=None, rng=None):
+    # The fixed-interval SendingApplication, a BulkSendingApplication when a
+    # backlog is given, or the given workload
+    if workload is not None:
+        try:
+            cls = WORKLOADS[workload.lower()]
+        except KeyError:
+            raise ValueError("Unknown workload %r (available: %s)" % (workload, ", ".join(sorted(WORKLOADS))))
+        params = dict(workload_params or {})
+        if backlog is not None:
+            params["backlog"] = backlog
+        return cls(env, token_rate=token_rate, bucket_size=bucket_size, rng=rng, **params)
+    if backlog is None:
+        return SendingApplication(env, sending_interval=sending_interval)
+    return BulkSendingApplication(env, sending_interval=sending_interval, backlog=backlog, token_rate=token_rate, bucket_size=bucket_size)
+
+class Simulation(object):
+
+    def __init__(self, algorithm="AIMD", bandwidth=100, propagation_delay=2, transmission_rate=1000,
+                 timeout_value=5, packet_length=16, sending_interval=1, seed=None, env=None,
+                 backlog=None, token_rate=None, bucket_size=1, workload=None, workload_params=None,
+                 rcv_window=1024, ack_every=1, ack_delay=1, batch_delivery=False, backend="simpy", trace=None, recording=None):
+        # Keep the configuration so that it can be reported with the results
+        self.config = {
+            "algorithm": algorithm,
+            "bandwidth": bandwidth,
+            "propagation_delay": propagation_delay,
+            "transmission_rate": transmission_rate,
+            "timeout_value": timeout_value,
+            "packet_length": packet_length,
+            "sending_interval": sending_interval,
+            "seed": seed,
+            "backlog": backlog,
+            "token_rate": token_rate,
+            "bucket_size": bucket_size,
+            "workload": workload,
+            "workload_params": workload_params,
+            "rcv_window": rcv_window,
+            "ack_every": ack_every,
+            "ack_delay": ack_delay,
+            "batch_delivery": batch_delivery,
+            "backend": backend,
+            "recording": recording,
+            "trace": trace,
+        }
+        # Every channel gets its own random stream, derived from the seed
+        self.streams = streams = RandomStreams(seed)
+
+        # Create a simulation environment (unless one is given)
+        self.env = env = env if env is not None else make_environment(backend)
+
+        # Populate the simulation environment with objects
+        self.sending_app = sending_application(env, sending_interval, backlog, token_rate, bucket_size,
+                                               workload, workload_params, streams.stream("WORKLOAD"))
+        self.receiving_app = ReceivingApplication(env)
+        self.tcp_sender = tcp_Sender(env=env, congestion_control=algorithm)
+        self.tcp_receiver = tcp_Receiver(env=env, rcv_window=rcv_window)
+
+        # Create the DATA and ACK channels
+        self.channel_for_data = UnreliableChannel(env=env, name="DATA_CHANNEL", propagation_delay=propagation_delay, transmission_rate=transmission_rate, bandwidth=bandwidth, rng=streams.stream("DATA_CHANNEL"), batch_delivery=batch_delivery, recording=recording)
+        self.channel_for_ack = UnreliableChannel(env=env, name="ACK_CHANNEL", propagation_delay=propagation_delay, transmission_rate=transmission_rate, bandwidth=bandwidth, rng=streams.stream("ACK_CHANNEL"), batch_delivery=batch_delivery, recording=recording)
+
+        # Set some parameters for the TCP Protocol
+        self.tcp_sender.timeout_value = timeout_value
+        self.tcp_sender.data_packet_length = packet_length
+        self.tcp_sender.cwnd = packet_length
+        self.tcp_receiver.data_packet_length = packet_length
+        self.tcp_receiver.ack_packet_length = packet_length
+        self.tcp_receiver.ack_every = ack_every
+        self.tcp_receiver.ack_delay = ack_delay
+        self.tcp_sender.byte_counting = ack_every > 1 or batch_delivery
+
+        # Connect the objects together
+        # Forward path
+        self.sending_app.tcp_sender = self.tcp_sender
+        self.tcp_sender.channel = self.channel_for_data
+        self.channel_for_data.receiver = self.tcp_receiver
+        self.tcp_receiver.receiving_app = self.receiving_app
+
+        # Backward path for ACKs
+        self.tcp_receiver.channel = self.channel_for_ack
+        self.channel_for_ack.receiver = self.tcp_sender
+
+        # Per-packet event trace
+        self.trace = TraceWriter(trace) if trace is not None else None
+        for component in (self.tcp_sender, self.channel_for_data, self.channel_for_ack):
+            component.trace = self.trace
+
+    def run(self, until=1000, max_messages=1000, print_status=False, sample_interval=1, stop_when=None):
+        # Run the simulation until "until" elapses OR the receiving application
+        # receives "max_messages" messages OR stop_when(simulation) returns True,
+        # whichever occurs earlier. stop_when is evaluated by a sampling process
+        # every "sample_interval", which also prints the sender status if print_status is set.
+        # Returns the reason for halting the simulation: "time", "max_messages" or "condition".
+        env = self.env
+        stop = env.event()
+        if until != float("inf"):
+            deadline = env.timeout(until - env.now)
+            deadline.callbacks.append(lambda event: stop.triggered or stop.succeed("time"))
+        if max_messages is not None:
+            if self.receiving_app.total_messages_received >= max_messages:
+                return "max_messages"
+            self.receiving_app.stop_after(max_messages, stop)
+        if print_status or stop_when is not None:
+            env.process(self.sample(sample_interval, print_status, stop_when, stop))
+        # SimPy processes the events until the stop event
+        try:
+            return env.run(until=stop)
+        finally:
+            if self.trace is not None:
+                self.trace.flush()
+
+    def close(self):
+        # Close the trace (if any)
+        if self.trace is not None:
+            self.trace.close()
+
+    def sample(self, interval, print_status, stop_when, stop):
+        # Sampling process: print the status and check the stop condition periodically
+        while not stop.triggered:
+            if print_status:
+                self.tcp_sender.print_status()
+            if stop_when is not None and stop_when(self):
+                stop.succeed("condition")
+                return
+            yield self.env.timeout(interval)
+
+    def summary(self):
+        # Statistics of the run, along with its configuration
+        sender = self.tcp_sender
+        receiver = self.tcp_receiver
+        result = dict(self.config)
+        result.update({
+            "sim_time": self.env.now,
+            "messages_sent": self.sending_app.total_messages_sent,
+            "messages_received": self.receiving_app.total_messages_received,
+            "packets_sent": sender.total_packets_sent,
+            "retransmissions": sender.num_retransmissions,
+            "retransmission_pct": sender.num_retransmissions / sender.total_packets_sent * 100.0 if sender.total_packets_sent else 0.0,
+            "ack_packets_sent": receiver.total_packets_sent,
+            "ack_retransmissions": receiver.num_retransmissions,
+            "ack_retransmission_pct": receiver.num_retransmissions / receiver.total_packets_sent * 100.0 if receiver.total_packets_sent else 0.0,
+            "throughput": self.receiving_app.total_messages_received / self.env.now if self.env.now else 0.0,
+            "final_cwnd": sender.cwnd,
+            "srtt": sender.RTT,
+            "rto": sender.timeout_value,
+        })
+        return result
+
+#==========================================================================================
+
+class MultiFlowSimulation(object):
+    # N flows competing for one BottleneckLink. Each flow has its own
+    # applications and TCP sender/receiver, and returns its ACKs over its
+    # own ACK channel.
+
+    def __init__(self, algorithms, propagation_delay=2, transmission_rate=1000, buffer_size=64,
+                 drop_policy="droptail", drop_params=None, timeout_value=5, packet_length=16, sending_interval=1, seed=None, env=None,
+                 backlog=None, token_rate=None, bucket_size=1, workload=None, workload_params=None,
+                 rcv_window=1024, ack_every=1, ack_delay=1, batch_delivery=False, backend="simpy", recording=None):
+        # "algorithms" gives the congestion control algorithm of each flow
+        self.streams = streams = RandomStreams(seed)
+        self.env = env = env if env is not None else make_environment(backend)
+        self.link = BottleneckLink(env=env, name="BOTTLENECK", propagation_delay=propagation_delay,
+                                   transmission_rate=transmission_rate, buffer_size=buffer_size, drop_policy=drop_policy, drop_params=drop_params,
+                                   rng=streams.stream("BOTTLENECK"), recording=recording, packet_length=packet_length)
+        self.flows = []
+        for algorithm in algorithms:
+            workload_stream_name = "WORKLOAD[%d]" % len(self.flows)
+            sending_app = sending_application(env, sending_interval, backlog, token_rate, bucket_size,
+                                              workload, workload_params, streams.stream(workload_stream_name))
+            receiving_app = ReceivingApplication(env)
+            tcp_sender = tcp_Sender(env=env, congestion_control=algorithm)
+            tcp_receiver = tcp_Receiver(env=env, rcv_window=rcv_window)
+            ack_channel_name = "ACK_CHANNEL[%d]" % len(self.flows)
+            channel_for_ack = UnreliableChannel(env=env, name=ack_channel_name, propagation_delay=propagation_delay, transmission_rate=transmission_rate, bandwidth=transmission_rate, rng=streams.stream(ack_channel_name), batch_delivery=batch_delivery, recording=recording)
+
+            tcp_sender.timeout_value = timeout_value
+            tcp_sender.data_packet_length = packet_length
+            tcp_sender.cwnd = packet_length
+            tcp_receiver.data_packet_length = packet_length
+            tcp_receiver.ack_packet_length = packet_length
+            tcp_receiver.ack_every = ack_every
+            tcp_receiver.ack_delay = ack_delay
+            tcp_sender.byte_counting = ack_every > 1 or batch_delivery
+
+            # Forward path through the bottleneck
+            sending_app.tcp_sender = tcp_sender
+            tcp_sender.channel = self.link.attach(tcp_receiver)
+            tcp_receiver.receiving_app = receiving_app
+
+            # Backward path for ACKs
+            tcp_receiver.channel = channel_for_ack
+            channel_for_ack.receiver = tcp_sender
+
+            self.flows.append((sending_app, tcp_sender, tcp_receiver, receiving_app))
+
+    def run(self, until=1000):
+        self.env.run(until=until)
+
+    def summary(self):
+        now = self.env.now
+        flows = []
+        for port, (sending_app, sender, receiver, receiving_app) in zip(self.link.ports, self.flows):
+            flows.append({
+                "flow": port.flow_id,
+                "algorithm": sender.congestion_control.name,
+                "messages_received": receiving_app.total_messages_received,
+                "packets_sent": sender.total_packets_sent,
+                "retransmissions": sender.num_retransmissions,
+                "packets_dropped": port.packets_dropped,
+                "throughput": port.bits_delivered / now if now else 0.0, # bits per unit of time
+                "mean_queueing_delay": port.queueing_delay_total / port.packets_delivered if port.packets_delivered else 0.0,
+            })
+        delays = self.link.queueing_delay.columns["value"]
+        return {
+            "sim_time": now,
+            "aggregate_throughput": sum(flow["throughput"] for flow in flows),
+            "utilization": self.link.channel_utilization_time / now if now else 0.0,
+            "fairness": jain_fairness(flow["throughput"] for flow in flows),
+            "mean_queueing_delay": sum(delays) / len(delays) if delays else 0.0,
+            "max_queueing_delay": max(delays) if delays else 0.0,
+            "packets_dropped": sum(flow["packets_dropped"] for flow in flows),
+            "flows": flows,
+        }
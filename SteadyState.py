@@ -0,0 +1,107 @@
+# Steady-state detection for congestion-window runs.
+#
+# The detector samples the congestion window, the throughput and the loss
+# (re-transmission) rate of a simulation at regular intervals, and estimates
+# the mean of each metric with the method of batch means. The number of
+# batches is bounded: when it reaches max_batches, adjacent batches are merged
+# and the batch size doubles, so the batches stay long enough to be nearly
+# independent and the memory stays constant. Once every confidence interval is
+# narrower than the requested precision, the run can stop early:
+#
+#   detector = SteadyStateDetector(precision=0.05)
+#   sim.run(until=100000, max_messages=None, stop_when=detector)
+#   detector.report()  # mean and confidence interval half-width of every metric
+
+import math
+from statistics import NormalDist
+
+def t_quantile(p, df):
+    # Quantile of Student's t distribution, from the normal quantile
+    # (Cornish-Fisher expansion, accurate to ~1e-3 for df >= 5)
+    z = NormalDist().inv_cdf(p)
+    z3, z5, z7 = z ** 3, z ** 5, z ** 7
+    return (z + (z3 + z) / (4 * df) + (5 * z5 + 16 * z3 + 3 * z) / (96 * df ** 2)
+            + (3 * z7 + 19 * z5 + 17 * z3 - 15 * z) / (384 * df ** 3))
+
+class BatchMeans(object):
+    # Online batch-means estimator with at most "max_batches" batches
+
+    def __init__(self, batch_size=10, max_batches=40):
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.batches = []
+        self._sum = 0.0
+        self._count = 0
+
+    def add(self, value):
+        self._sum += value
+        self._count += 1
+        if self._count == self.batch_size:
+            self.batches.append(self._sum / self.batch_size)
+            self._sum = 0.0
+            self._count = 0
+            if len(self.batches) == self.max_batches:
+                # Merge adjacent batches and double the batch size
+                self.batches = [(a + b) / 2 for a, b in zip(self.batches[::2], self.batches[1::2])]
+                self.batch_size *= 2
+
+    def mean(self):
+        return sum(self.batches) / len(self.batches) if self.batches else float("nan")
+
+    def half_width(self, confidence=0.95):
+        # Half-width of the confidence interval of the mean
+        n = len(self.batches)
+        if n < 2:
+            return float("inf")
+        mean = self.mean()
+        variance = sum((b - mean) ** 2 for b in self.batches) / (n - 1)
+        return t_quantile(0.5 + confidence / 2, n - 1) * math.sqrt(variance / n)
+
+class SteadyStateDetector(object):
+    # To be used as the stop_when condition of Simulation.run()
+
+    METRICS = ("cwnd", "throughput", "loss_rate")
+
+    def __init__(self, precision=0.05, tolerance=0.0, confidence=0.95, warmup=50,
+                 batch_size=10, max_batches=40, min_batches=10):
+        # precision: relative half-width of the confidence intervals (0.05 = +/-5% of the mean)
+        # tolerance: absolute half-width that is always accepted (for metrics with a mean close to 0)
+        # warmup: simulation time during which the samples are discarded
+        self.precision = precision
+        self.tolerance = tolerance
+        self.confidence = confidence
+        self.warmup = warmup
+        self.min_batches = min_batches
+        self.estimators = {name: BatchMeans(batch_size, max_batches) for name in self.METRICS}
+        self.converged = False
+        self._last = None # (time, messages received, packets sent, re-transmissions) at the previous sample
+
+    def __call__(self, sim):
+        now = sim.env.now
+        sender = sim.tcp_sender
+        current = (now, sim.receiving_app.total_messages_received, sender.total_packets_sent, sender.num_retransmissions)
+        last, self._last = self._last, current
+        if now < self.warmup or last is None or now == last[0]:
+            return False
+
+        # Sample the metrics over the last sampling interval
+        sent = current[2] - last[2]
+        self.estimators["cwnd"].add(sender.cwnd)
+        self.estimators["throughput"].add((current[1] - last[1]) / (now - last[0]))
+        self.estimators["loss_rate"].add((current[3] - last[3]) / sent if sent else 0.0)
+
+        self.converged = all(self.is_stable(estimator) for estimator in self.estimators.values())
+        return self.converged
+
+    def is_stable(self, estimator):
+        if len(estimator.batches) < self.min_batches:
+            return False
+        return estimator.half_width(self.confidence) <= max(self.precision * abs(estimator.mean()), self.tolerance)
+
+    def report(self):
+        # Mean and confidence interval half-width of every metric
+        result = {"converged": self.converged}
+        for name, estimator in self.estimators.items():
+            result[name + "_mean"] = estimator.mean()
+            result[name + "_ci"] = estimator.half_width(self.confidence)
+        return result
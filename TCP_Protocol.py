@@ -0,0 +1,533 @@
+# SimPy models for TCP_Sender and TCP_Receiver
+# implementing the TCP Protocol.
+#
+# The window-update rules are delegated to a congestion-control strategy
+# (see CongestionControl.py), picked by name when the sender is created:
+#
+#   tcp_sender = tcp_Sender(env, congestion_control="AIMD")
+#
+# The retransmission timeout is adapted to the measured round trip times
+# (RFC 6298), starting from the configured timeout_value.
+#
+# The receiver advertises the out-of-order data it holds with SACK blocks,
+# and the sender keeps a scoreboard of the SACKed packets so that it only
+# re-transmits the holes.
+#
+# Every ACK advertises the receive window (the size of the receiver's ring
+# buffer), and the sender never has more than min(cwnd, rwnd) in flight, so
+# no packet is dropped for falling beyond the receiver's buffer.
+#
+# The receiver can delay its ACKs (one ACK every ack_every in-order packets,
+# or after ack_delay), in which case the sender counts the packets covered by
+# each ACK (byte_counting) so that its window grows as with one ACK per packet.
+#
+# With a batch-delivery channel, the packets arriving together are handed
+# over at once (tcp_rcv_batch): the receiver acknowledges them with a single
+# cumulative ACK, or with one duplicate ACK per out-of-order packet (as if
+# they had arrived one by one, so that the sender can still count three
+# duplicate ACKs for fast retransmit).
+#
+# With a TraceWriter as "trace" (see Trace.py), the sender records its ACKs,
+# duplicate ACKs, re-transmissions and timeouts.
+#
+# A congestion control can pace the new packets by setting the sender's
+# pacing_rate: they are then released one at a time by a pacing process,
+# instead of being sent as soon as the window allows.
+
+from collections import deque
+from Packet import Packet
+from Logger import logger, DEBUG, INFO, WARNING
+from Metrics import TimeSeries
+from CongestionControl import SLOW_START, CongestionControl, get_congestion_control
+
+class RTTEstimator(object):
+    # Smoothed RTT and retransmission timeout (RTO) estimation, as in RFC 6298
+
+    def __init__(self, alpha=0.125, beta=0.25, K=4, granularity=0.1, min_rto=1, max_rto=60):
+        self.alpha = alpha
+        self.beta = beta
+        self.K = K
+        self.granularity = granularity # clock granularity G
+        self.min_rto = min_rto
+        self.max_rto = max_rto
+        self.srtt = None
+        self.rttvar = None
+
+    def update(self, sample):
+        # Take a new RTT measurement into account and return the new RTO
+        if self.srtt is None:
+            self.srtt = sample
+            self.rttvar = sample / 2
+        else:
+            self.rttvar = (1 - self.beta) * self.rttvar + self.beta * abs(self.srtt - sample)
+            self.srtt = (1 - self.alpha) * self.srtt + self.alpha * sample
+        rto = self.srtt + max(self.granularity, self.K * self.rttvar)
+        return min(max(rto, self.min_rto), self.max_rto)
+
+    def backoff(self, rto):
+        # Exponential backoff of the RTO after a timeout
+        return min(2 * rto, self.max_rto)
+
+#==========================================================================================
+
+class tcp_Sender(object):
+
+    def __init__(self, env, congestion_control="AIMD"):
+        # Initialize variables and parameters
+        self.env = env
+        self.channel = None
+
+        # Congestion-control strategy (an algorithm name or a CongestionControl instance)
+        if not isinstance(congestion_control, CongestionControl):
+            congestion_control = get_congestion_control(congestion_control)
+        self.congestion_control = congestion_control
+
+        # Default parameter values
+        self.data_packet_length = 16 # bits
+        self.timeout_value = 5 # default timeout value for the sender
+        self.cwnd = self.data_packet_length
+        self.RTT = 4 # replaced by the smoothed RTT once it has been measured
+        self.ssthresh = float('inf')
+        self.state = SLOW_START
+
+        # State variables and parameters for the Go-Back-N Protocol
+        self.sendbase = 1 # base of the current window
+        self.nextseqnum = 1 # next sequence number
+        self.sndpkt = {} # buffer for storing the packets to be sent (implemented as a Python dictionary)
+        self.send_times = {} # time at which each buffered packet was sent, None once it was re-transmitted
+
+        # Selective acknowledgements
+        self.sack = True # use the SACK blocks advertised by the receiver
+        self.sacked = set() # scoreboard: buffered packets the receiver already holds
+
+        # Receive window advertised by the receiver (bits)
+        self.rwnd = float("inf")
+
+        # Variables to maintain sender-side statistics
+        self.total_packets_sent = 0
+        self.num_retransmissions = 0
+        self.dupACKPackets = 0
+        self.cwnd_inc = 0
+        self.acked_segments = 0 # packets acknowledged by the latest new ACK
+        self.byte_counting = False # let the window grow by the number of packets each ACK covers (RFC 3465)
+
+        # Timer-related variables
+        self.timer_is_running = False
+        self.timer = None # pending wake-up of the timer (a timeout event)
+        self.timer_deadline = None # expiry time of the running timer
+        self.timer_wakeup = None # time of the pending wake-up
+        self.rtt_estimator = RTTEstimator() # set to None to keep a fixed timeout_value
+        self.last_rtt_sample = None # RTT measured on the latest new ACK (None if it acknowledged a re-transmitted packet)
+
+        # Called after every ACK, when the window may have opened (set by the sending application)
+        self.on_window_open = None
+
+        # Pacing (used when the congestion control sets pacing_rate, in bits per unit of time)
+        self.pacing_rate = None
+        self.pacing_queue = deque() # new packets waiting for the pacing process
+        self.pacer = None # the pacing process, started on the first paced packet
+        self.pacer_armed = None # event the idle pacing process waits on
+
+        # Congestion window sampled by print_status()
+        self.cwnd_trace = TimeSeries()
+
+        # Per-packet event trace (a Trace.TraceWriter), disabled by default
+        self.trace = None
+
+    def tcp_send(self, msg):
+        # This function is called by the sending application.
+        # Check if the next sequence number data can be sent
+        if self.nextseqnum + self.data_packet_length - self.sendbase <= min(self.cwnd, self.rwnd):
+            if logger.info:
+                logger.log(INFO, self.env.now, "TCP_SENDER", "tcp_send", nextseqnum=self.nextseqnum, accepted=True)
+            # Create a new packet and store it in the buffer
+            self.sndpkt[self.nextseqnum] = Packet(seq_num=self.nextseqnum, payload=msg, packet_length=self.data_packet_length)
+            self.send_times[self.nextseqnum] = self.env.now
+            # Send the packet, or hand it to the pacing process
+            if self.pacing_rate is None:
+                self.channel.udt_send(self.sndpkt[self.nextseqnum], self.cwnd, self.RTT)
+                self.total_packets_sent += 1
+            else:
+                self.pace(self.nextseqnum)
+
+            # Start the timer if required
+            if self.sendbase == self.nextseqnum:
+                self.start_timer()
+            # Update the next sequence number
+            self.nextseqnum = self.nextseqnum + self.data_packet_length
+            return True
+        else:
+            if logger.info:
+                logger.log(INFO, self.env.now, "TCP_SENDER", "tcp_send", nextseqnum=self.nextseqnum, accepted=False)
+            return False
+
+    def tcp_send_batch(self, msgs):
+        # Send the messages of the sequence "msgs" in order, as long as the window
+        # allows, and return how many of them were accepted
+        L = self.data_packet_length
+        window = min(self.cwnd, self.rwnd)
+        accepted = 0
+        for msg in msgs:
+            seq_num = self.nextseqnum
+            if seq_num + L - self.sendbase > window:
+                break
+            packt = Packet(seq_num=seq_num, payload=msg, packet_length=L)
+            self.sndpkt[seq_num] = packt
+            self.send_times[seq_num] = self.env.now
+            if self.pacing_rate is None:
+                self.channel.udt_send(packt, self.cwnd, self.RTT)
+                self.total_packets_sent += 1
+            else:
+                self.pace(seq_num)
+            if self.sendbase == seq_num:
+                self.start_timer()
+            self.nextseqnum = seq_num + L
+            accepted += 1
+        if logger.info:
+            logger.log(INFO, self.env.now, "TCP_SENDER", "tcp_send_batch", nextseqnum=self.nextseqnum, offered=len(msgs), accepted=accepted)
+        return accepted
+
+    def tcp_rcv(self, packt):
+        # This function is called by the lower-layer when an ACK packet arrives
+        if packt.window is not None:
+            self.rwnd = packt.window
+        if packt.sack and self.sack:
+            self.update_scoreboard(packt.sack)
+        if packt.seq_num > self.sendbase:
+            self.stop_timer()
+            self.acked_segments = (packt.seq_num - self.sendbase) // self.data_packet_length
+            while self.sendbase < packt.seq_num:
+                # Remove packet from buffer and slide the window right
+                del self.sndpkt[self.sendbase]
+                sent_at = self.send_times.pop(self.sendbase)
+                if self.sendbase in self.sacked:
+                    self.sacked.discard(self.sendbase)
+                    sent_at = None
+                self.sendbase = self.sendbase + self.data_packet_length
+
+            # Measure the RTT on the newest acknowledged packet, unless it was
+            # re-transmitted (Karn's algorithm: the ACK could be for either copy)
+            # or SACKed earlier (its cumulative ACK was held back by a hole)
+            self.last_rtt_sample = self.env.now - sent_at if sent_at is not None else None
+            if self.last_rtt_sample is not None and self.rtt_estimator is not None:
+                self.timeout_value = self.rtt_estimator.update(self.last_rtt_sample)
+                self.RTT = self.rtt_estimator.srtt
+
+            # Update the congestion window
+            self.congestion_control.on_ack(self)
+
+            assert(self.sendbase == packt.seq_num)
+
+            if self.sendbase != self.nextseqnum:
+                self.start_timer()
+            if logger.info:
+                logger.log(INFO, self.env.now, "TCP_SENDER", "ack", seq_num=packt.seq_num, cwnd=self.cwnd, base=self.sendbase, nextseqnum=self.nextseqnum)
+            if self.trace is not None:
+                self.trace.record(self.env.now, "TCP_SENDER", "ack", packt.seq_num, self.cwnd)
+        else:
+            if self.trace is not None:
+                self.trace.record(self.env.now, "TCP_SENDER", "dup_ack", packt.seq_num, self.cwnd)
+            if self.congestion_control.on_dup_ack(self):
+                self.fast_retransmit(packt.seq_num)
+
+        # Let the sending application fill the window again
+        if self.on_window_open is not None:
+            self.on_window_open()
+
+    def tcp_rcv_batch(self, packets):
+        # ACKs arriving together (from a batch-delivery channel), processed in order
+        for packt in packets:
+            self.tcp_rcv(packt)
+
+    def update_scoreboard(self, blocks):
+        # Mark the buffered packets covered by the SACK blocks
+        for start, end in blocks:
+            for seq_num in range(max(start, self.sendbase), end, self.data_packet_length):
+                if seq_num in self.sndpkt:
+                    self.sacked.add(seq_num)
+
+    def holes(self):
+        # Buffered packets below the highest SACKed one that the receiver does not hold
+        if not self.sacked:
+            return []
+        highest = max(self.sacked)
+        return [seq_num for seq_num in self.sndpkt if seq_num < highest and seq_num not in self.sacked]
+
+    def fast_retransmit(self, seqnum):
+        if seqnum in self.sndpkt.keys():
+            # With SACK, every hole is known to be lost, not only the first one
+            packets_to_be_resent = self.holes() if self.sacked else [seqnum]
+            for seq_num in packets_to_be_resent:
+                if self.trace is not None:
+                    self.trace.record(self.env.now, "TCP_SENDER", "retransmit", seq_num, self.cwnd)
+                self.channel.udt_send(self.sndpkt[seq_num], self.cwnd, self.RTT)
+                self.send_times[seq_num] = None
+                self.num_retransmissions += 1
+                self.total_packets_sent += 1
+            self.stop_timer()
+            self.start_timer()
+
+    # Functions for pacing the new packets.
+    # The pacing process is started once and sleeps while there is nothing to send.
+    def pace(self, seq_num):
+        self.pacing_queue.append(seq_num)
+        if self.pacer is None:
+            self.pacer = self.env.process(self.pacer_behavior())
+        elif self.pacer_armed is not None:
+            # Wake up the idle pacing process
+            armed, self.pacer_armed = self.pacer_armed, None
+            armed.succeed()
+
+    def pacer_behavior(self):
+        while True:
+            if not self.pacing_queue:
+                self.pacer_armed = self.env.event()
+                yield self.pacer_armed
+                continue
+            seq_num = self.pacing_queue.popleft()
+            packt = self.sndpkt[seq_num]
+            self.send_times[seq_num] = self.env.now
+            self.channel.udt_send(packt, self.cwnd, self.RTT)
+            self.total_packets_sent += 1
+            if self.pacing_rate is not None:
+                # Wait for the packet's time slot at the pacing rate
+                yield self.env.timeout(packt.packet_length / self.pacing_rate)
+
+    # Functions for modeling a Timer's behavior.
+    # The timer is a single pending wake-up (a timeout with a callback), at or
+    # before the current deadline. Starting or stopping the timer only updates
+    # the deadline; when the wake-up finds that the deadline has moved, it
+    # simply schedules a new wake-up for the new one.
+    def on_timer(self, event):
+        if event is not self.timer:
+            # Replaced by an earlier wake-up
+            return
+        self.timer = None
+        deadline = self.timer_deadline
+        if deadline is None:
+            # Stopped in the meantime
+            return
+        if self.env.now < deadline:
+            # Restarted in the meantime
+            self.schedule_timer(deadline)
+            return
+        self.timer_deadline = None
+        self.timer_is_running = False
+        # Take some actions
+        self.timeout_action()
+
+    def schedule_timer(self, deadline):
+        self.timer_wakeup = deadline
+        self.timer = self.env.timeout(deadline - self.env.now)
+        self.timer.callbacks.append(self.on_timer)
+
+    # This function can be called to start the timer
+    def start_timer(self):
+        self.timer_deadline = self.env.now + self.timeout_value
+        self.timer_is_running = True
+        if self.timer is None or self.timer_deadline < self.timer_wakeup:
+            # No wake-up, or one that would come too late
+            self.schedule_timer(self.timer_deadline)
+        if logger.debug:
+            logger.log(DEBUG, self.env.now, "TIMER", "started", timeout=self.timeout_value)
+
+    # This function can be called to stop the timer
+    def stop_timer(self):
+        self.timer_deadline = None
+        self.timer_is_running = False
+        if logger.debug:
+            logger.log(DEBUG, self.env.now, "TIMER", "stopped")
+
+    def restart_timer(self):
+        # Stop and start the timer
+        assert(self.timer_is_running == True)
+        self.start_timer()
+
+    # Actions to be performed upon timeout
+    def timeout_action(self):
+        self.congestion_control.on_timeout(self)
+
+        # Re-send all the packets for which an ACK has been pending,
+        # except those the receiver reported in its SACK blocks,
+        # and those still waiting for the pacing process (never sent yet)
+        waiting = set(self.pacing_queue)
+        packets_to_be_resent = [seq_num for seq_num in self.sndpkt if seq_num not in self.sacked and seq_num not in waiting]
+        if logger.warning:
+            logger.log(WARNING, self.env.now, "TCP_SENDER", "timeout", resent=packets_to_be_resent)
+        if self.trace is not None:
+            self.trace.record(self.env.now, "TCP_SENDER", "timeout", self.sendbase, self.cwnd)
+        for seq_num in packets_to_be_resent:
+            if self.trace is not None:
+                self.trace.record(self.env.now, "TCP_SENDER", "retransmit", seq_num, self.cwnd)
+            self.channel.udt_send(self.sndpkt[seq_num], self.cwnd, self.RTT)
+            self.send_times[seq_num] = None
+            self.num_retransmissions += 1
+            self.total_packets_sent += 1
+
+        # Re-start the timer, backing off the timeout value
+        if self.rtt_estimator is not None:
+            self.timeout_value = self.rtt_estimator.backoff(self.timeout_value)
+        self.start_timer()
+
+    # A function to print the current window position for the sender.
+    def print_status(self):
+        if logger.info:
+            logger.log(INFO, self.env.now, "TCP_SENDER", "status", cwnd=self.cwnd, base=self.sendbase, nextseqnum=self.nextseqnum)
+        self.cwnd_trace.record(self.env.now, self.cwnd)
+
+#==========================================================================================
+
+class tcp_Receiver(object):
+
+    def __init__(self, env, rcv_window=1024):
+        # Initialize variables
+        self.env = env
+        self.receiving_app = None
+        self.channel = None
+
+        # Default parameter values
+        self.data_packet_length = 16 # bits
+        self.ack_packet_length = 16 # bits
+
+        self.rcvbase = 1
+
+        self.sndpkt = Packet(seq_num=0, payload="ACK", packet_length=self.ack_packet_length)
+        self.total_packets_sent = 0
+        self.num_retransmissions = 0
+
+        # Out-of-order packets are buffered in a ring buffer covering the
+        # receive window [rcvbase, rcvbase + rcv_window packets).
+        # A packet with sequence number s is kept in slot (s // data_packet_length) % rcv_window.
+        # The window is advertised in every ACK, so the sender does not send beyond it.
+        self.rcv_window = rcv_window # packets
+        self.rcvbuf = [None] * self.rcv_window
+        self.window_drops = 0 # packets dropped for falling beyond the window
+
+        # Selective acknowledgements: sorted [start, end) ranges of the buffered
+        # packets, the first max_sack_blocks of which are advertised in each ACK
+        self.sack = True
+        self.max_sack_blocks = 3
+        self.sack_blocks = []
+
+        # Delayed ACKs: in-order packets are acknowledged every "ack_every"
+        # packets, or "ack_delay" after the first unacknowledged one.
+        # Out-of-order packets are acknowledged right away (duplicate ACKs).
+        # With ack_every=float("inf") and ack_delay=0, the packets arriving
+        # at the same time are acknowledged by a single ACK.
+        self.ack_every = 1
+        self.ack_delay = 1
+        self.unacked_segments = 0
+        self.ack_timer = None # pending delayed-ACK timeout
+
+    def tcp_rcv(self, packt):
+        # This function is called by the lower-layer when a packet arrives at the receiver
+        delivered = self.receive(packt)
+        self.acknowledge(delivered, 0 if delivered else 1)
+
+    def tcp_rcv_batch(self, packets):
+        # Packets arriving together (from a batch-delivery channel):
+        # processed in order, then acknowledged by one cumulative ACK
+        # (or one duplicate ACK per out-of-order packet)
+        delivered = 0
+        out_of_order = 0
+        for packt in packets:
+            count = self.receive(packt)
+            delivered += count
+            if not count:
+                out_of_order += 1
+        self.acknowledge(delivered, out_of_order)
+
+    def receive(self, packt):
+        # Buffer the packet and deliver the in-order data to the application.
+        # Returns the number of packets delivered.
+        if logger.info:
+            logger.log(INFO, self.env.now, "TCP_RECEIVER", "tcp_rcv", seq_num=packt.seq_num)
+        # Buffer the packet if it falls within the receive window and is not a duplicate
+        # (packets beyond the window are dropped, the sender will re-transmit them)
+        rcvbuf = self.rcvbuf
+        if packt.seq_num >= self.rcvbase + self.rcv_window * self.data_packet_length:
+            self.window_drops += 1
+        elif self.rcvbase <= packt.seq_num:
+            slot = (packt.seq_num // self.data_packet_length) % self.rcv_window
+            if rcvbuf[slot] is None:
+                rcvbuf[slot] = packt
+                if self.sack:
+                    self.add_sack_block(packt.seq_num, packt.seq_num + packt.packet_length)
+                if logger.debug:
+                    logger.log(DEBUG, self.env.now, "TCP_RECEIVER", "buffered", seq_num=packt.seq_num)
+
+        # Deliver the in-order packets and slide the window right
+        delivered = 0
+        slot = (self.rcvbase // self.data_packet_length) % self.rcv_window
+        buffered = rcvbuf[slot]
+        while buffered is not None and buffered.seq_num == self.rcvbase:
+            self.receiving_app.deliver_data(buffered.payload)
+            rcvbuf[slot] = None
+            self.rcvbase = self.rcvbase + buffered.packet_length
+            delivered += 1
+            if logger.debug:
+                logger.log(DEBUG, self.env.now, "TCP_RECEIVER", "rcvbase", rcvbase=self.rcvbase)
+            slot = (self.rcvbase // self.data_packet_length) % self.rcv_window
+            buffered = rcvbuf[slot]
+
+        # Forget the delivered ranges
+        if self.sack:
+            blocks = self.sack_blocks
+            while blocks and blocks[0][1] <= self.rcvbase:
+                del blocks[0]
+        return delivered
+
+    def acknowledge(self, delivered, out_of_order):
+        # Send or delay the ACK for "delivered" in-order packets
+        # and "out_of_order" out-of-order or duplicate ones
+        if out_of_order:
+            # One duplicate ACK per out-of-order packet, right away (cumulative,
+            # covering the delivered packets too)
+            for _ in range(out_of_order):
+                self.send_ack()
+            self.num_retransmissions += out_of_order
+            return
+        self.unacked_segments += delivered
+        if self.unacked_segments >= self.ack_every or (self.sack and self.sack_blocks) or delivered > 1:
+            # Enough packets, or a hole being filled: acknowledge right away
+            self.send_ack()
+        elif self.ack_timer is None:
+            self.ack_timer = self.env.timeout(self.ack_delay)
+            self.ack_timer.callbacks.append(self.on_ack_timer)
+
+    def on_ack_timer(self, event):
+        if event is self.ack_timer:
+            self.send_ack()
+
+    def send_ack(self):
+        # Cumulative ACK for everything received in order, with the SACK blocks
+        self.unacked_segments = 0
+        self.ack_timer = None
+        sack = ()
+        if self.sack and self.sack_blocks:
+            sack = tuple((start, end) for start, end in self.sack_blocks[:self.max_sack_blocks])
+
+        # Packets are immutable, so the last ACK is re-used for duplicate ACKs
+        window = self.rcv_window * self.data_packet_length
+        if (self.sndpkt.seq_num != self.rcvbase or self.sndpkt.sack != sack or self.sndpkt.window != window
+                or self.sndpkt.packet_length != self.ack_packet_length):
+            self.sndpkt = Packet(seq_num=self.rcvbase, payload="ACK", packet_length=self.ack_packet_length, sack=sack, window=window)
+        self.channel.udt_send(self.sndpkt, -1, 1)
+        self.total_packets_sent += 1
+
+    def add_sack_block(self, start, end):
+        # Merge the range [start, end) into the sorted list of SACK blocks
+        blocks = self.sack_blocks
+        i = 0
+        while i < len(blocks) and blocks[i][1] < start:
+            i += 1
+        if i < len(blocks) and blocks[i][0] <= end:
+            # Overlapping or adjacent block: extend it, and merge it with the following ones
+            block = blocks[i]
+            block[0] = min(block[0], start)
+            block[1] = max(block[1], end)
+            while i + 1 < len(blocks) and blocks[i + 1][0] <= block[1]:
+                block[1] = max(block[1], blocks[i + 1][1])
+                del blocks[i + 1]
+        else:
+            blocks.insert(i, [start, end])
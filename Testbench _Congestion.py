@@ -1,58 +1,42 @@
-import simpy
-from Applications import SendingApplication, ReceivingApplication
-from Channel import UnreliableChannel
-from TCP_Protocol_WithCongestionControl_AIMD import tcp_Sender, tcp_Receiver
 import matplotlib.pyplot as plt
-import CWind
+import Logger
+from Simulation import Simulation
 
-# Create a simulation environment
-env = simpy.Environment()
+# Congestion control algorithm to analyze: AIMD, AIAD, MIAD or MIMD
+ALGORITHM = "AIMD"
 
-# Populate the simulation environment with objects:
-sending_app = SendingApplication(env, sending_interval=1)  # Sending application with 1 second interval
-receiving_app = ReceivingApplication(env)  # Receiving application
-tcp_sender = tcp_Sender(env=env)  # TCP sender with congestion control
-tcp_receiver = tcp_Receiver(env=env)  # TCP receiver with congestion control
+# Per-event log level: Logger.DEBUG prints every event, Logger.OFF disables the log on long runs.
+# An NDJSON file can be used instead of stdout with Logger.configure(sinks=[Logger.NDJSONSink("events.ndjson")])
+Logger.configure(level=Logger.DEBUG)
 
-# Create the DATA and ACK channels and set channel parameters
-channel_for_data = UnreliableChannel(env=env, name="DATA_CHANNEL", propagation_delay=2, transmission_rate=1000, bandwidth=100)
-channel_for_ack = UnreliableChannel(env=env, name="ACK_CHANNEL", propagation_delay=2, transmission_rate=1000, bandwidth=100)
-
-# Set some parameters for the TCP Protocol
-tcp_sender.timeout_value = 5  # Timeout value for the sender
-tcp_sender.data_packet_length = 16  # Length of the DATA packet in bits
-tcp_receiver.ack_packet_length = 16  # Length of the ACK packet in bits
-
-# Connect the objects together
-# Forward path
-sending_app.tcp_sender = tcp_sender
-tcp_sender.channel = channel_for_data
-channel_for_data.receiver = tcp_receiver
-tcp_receiver.receiving_app = receiving_app
-
-# Backward path for ACKs
-tcp_receiver.channel = channel_for_ack
-channel_for_ack.receiver = tcp_sender
+# Create the simulation environment and connect the sending/receiving applications,
+# the TCP sender/receiver and the DATA and ACK channels together.
+# For batch runs over many parameter values, use tcpsim.py instead.
+sim = Simulation(
+    algorithm=ALGORITHM,
+    sending_interval=1,  # Sending application with 1 second interval
+    propagation_delay=2,
+    transmission_rate=1000,
+    bandwidth=100,
+    timeout_value=5,  # Timeout value for the sender
+    packet_length=16,  # Length of the DATA and ACK packets in bits
+)
+sending_app = sim.sending_app
+receiving_app = sim.receiving_app
+tcp_sender = sim.tcp_sender
+tcp_receiver = sim.tcp_receiver
+channel_for_data = sim.channel_for_data
 
 # Run simulation, and print status information every now and then.
 # Run the simulation until TOTAL_SIMULATION_TIME elapses OR the receiver receives a certain number of messages in total, whichever occurs earlier.
 
 TOTAL_SIMULATION_TIME = 1000  # Total simulation time. Increase it as you like.
-t = 0
-while t < TOTAL_SIMULATION_TIME:
-    if(env.peek() > t):
-        tcp_sender.print_status()
-    env.step()
-    t = int(env.now)
-    
-    # We may wish to halt the simulation if some condition occurs.
-    # For example, if the receiving application receives 1000 messages.
-    num_msg = receiving_app.total_messages_received
-    if num_msg >= 1000:  # Halt simulation when receiving application receives these many messages.
-        print("\n\nReceiving application received", num_msg, "messages. Halting simulation.")
-        break
+MAX_MESSAGES = 1000  # Halt simulation when receiving application receives these many messages.
+reason = sim.run(until=TOTAL_SIMULATION_TIME, max_messages=MAX_MESSAGES, print_status=True)
 
-if t == TOTAL_SIMULATION_TIME:
+if reason == "max_messages":
+    print("\n\nReceiving application received", receiving_app.total_messages_received, "messages. Halting simulation.")
+else:
     print("\n\nTotal simulation time has elapsed. Halting simulation.")
 
 # Print some statistics at the end of simulation:
@@ -70,10 +54,9 @@ print("Total number of ACK packets sent by tcp_Receiver= %d" % tcp_receiver.tota
 print("Total number of re-transmitted ACK packets= %d (%0.2f%% of total packets sent)" % (tcp_receiver.num_retransmissions, (tcp_receiver.num_retransmissions / tcp_receiver.total_packets_sent * 100.0)))
 
 # Plotting congestion window over time
-keys1 = channel_for_data.cwnd_values.keys()
-values1 = channel_for_data.cwnd_values.values()
+cwnd_values = channel_for_data.cwnd_values.to_numpy()
 
-plt.plot(keys1, values1)
+plt.plot(cwnd_values["time"], cwnd_values["value"])
 plt.ylabel("Congestion Window")
 plt.xlabel("Time")
 plt.legend()
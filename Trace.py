@@ -0,0 +1,149 @@
+# Columnar binary trace of the per-packet events of a simulation.
+#
+# The channels and the TCP sender append one fixed-width record per event to
+# a TraceWriter (when their "trace" attribute is set):
+#   - channel: "send" (the packet enters the channel, with the sender's cwnd),
+#              "lost", "deliver" (the packet reaches the other end)
+#   - sender:  "ack" (new cumulative ACK, with the updated cwnd), "dup_ack",
+#              "retransmit", "timeout" (with the send base)
+#
+# A trace is a directory holding one raw file per column (time, source,
+# event, seq, cwnd) and a schema.json describing them. The records are
+# buffered in array columns and appended to the files chunk by chunk, so
+# writing a trace takes constant memory. TraceReader maps the column files
+# with numpy.memmap: the columns are read lazily by the OS, without copying
+# them into memory.
+#
+#   sim = Simulation(algorithm="AIMD", trace="aimd.trace")
+#   sim.run()
+#   sim.trace.close()
+#   trace = TraceReader("aimd.trace")
+#   sends = trace.select("send", "DATA_CHANNEL")
+#   trace["time"][sends], trace["seq"][sends], trace["cwnd"][sends]
+
+import json
+import os
+from array import array
+
+EVENTS = ("send", "lost", "deliver", "ack", "dup_ack", "retransmit", "timeout")
+EVENT_CODES = {name: code for code, name in enumerate(EVENTS)}
+
+# Name and array typecode of every column
+COLUMNS = (("time", "d"), ("source", "H"), ("event", "B"), ("seq", "q"), ("cwnd", "d"))
+
+SCHEMA = "schema.json"
+
+class TraceWriter(object):
+
+    def __init__(self, path, chunk_size=65536):
+        # path: directory of the trace (created if needed)
+        # chunk_size: records buffered before they are written to the files
+        self.path = path
+        self.chunk_size = chunk_size
+        os.makedirs(path, exist_ok=True)
+        self.buffers = [array(typecode) for _, typecode in COLUMNS]
+        self.files = [open(os.path.join(path, name + ".bin"), "wb") for name, _ in COLUMNS]
+        self.sources = {} # source name -> id
+        self.records = 0 # records written to the files
+        self.closed = False
+        self.write_schema()
+
+    def record(self, time, source, event, seq, cwnd=float("nan")):
+        source_id = self.sources.get(source)
+        if source_id is None:
+            source_id = self.sources[source] = len(self.sources)
+        time_buf, source_buf, event_buf, seq_buf, cwnd_buf = self.buffers
+        time_buf.append(time)
+        source_buf.append(source_id)
+        event_buf.append(EVENT_CODES[event])
+        seq_buf.append(seq)
+        cwnd_buf.append(cwnd)
+        if len(time_buf) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        # Append the buffered records to the column files, then update the schema
+        # (the schema never counts records that are not completely written)
+        count = len(self.buffers[0])
+        if count:
+            for buffer, f in zip(self.buffers, self.files):
+                buffer.tofile(f)
+                f.flush()
+                del buffer[:]
+            self.records += count
+        self.write_schema()
+
+    def write_schema(self):
+        schema = {
+            "records": self.records,
+            "columns": {name: {"file": name + ".bin", "dtype": dtype_str(typecode)} for name, typecode in COLUMNS},
+            "events": list(EVENTS),
+            "sources": sorted(self.sources, key=self.sources.get),
+        }
+        tmp_path = os.path.join(self.path, SCHEMA + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(schema, f, indent=2)
+        os.replace(tmp_path, os.path.join(self.path, SCHEMA))
+
+    def close(self):
+        if self.closed:
+            return
+        self.flush()
+        for f in self.files:
+            f.close()
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def dtype_str(typecode):
+    # numpy dtype of an array typecode, with the byte order of this machine
+    import numpy
+    return numpy.dtype(typecode).str
+
+class TraceReader(object):
+
+    def __init__(self, path):
+        import numpy
+        with open(os.path.join(path, SCHEMA)) as f:
+            schema = json.load(f)
+        self.path = path
+        self.records = schema["records"]
+        self.events = schema["events"]
+        self.sources = schema["sources"]
+        self.columns = {}
+        for name, column in schema["columns"].items():
+            dtype = numpy.dtype(column["dtype"])
+            if self.records:
+                self.columns[name] = numpy.memmap(os.path.join(path, column["file"]), dtype=dtype, mode="r", shape=(self.records,))
+            else:
+                self.columns[name] = numpy.empty(0, dtype=dtype)
+
+    def __len__(self):
+        return self.records
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def select(self, event=None, source=None):
+        # Boolean mask of the records of an event and/or a source
+        import numpy
+        mask = numpy.ones(self.records, dtype=bool)
+        if event is not None:
+            mask &= self.columns["event"] == self.events.index(event)
+        if source is not None:
+            mask &= self.columns["source"] == self.sources.index(source)
+        return mask
+
+    def ack_times(self, seq, source="TCP_SENDER"):
+        # Time of the first cumulative ACK covering each sequence number of
+        # "seq" (inf if the packet was never acknowledged)
+        import numpy
+        acks = self.select("ack", source)
+        ack_seq = numpy.maximum.accumulate(self.columns["seq"][acks])
+        ack_time = self.columns["time"][acks]
+        index = numpy.searchsorted(ack_seq, seq, side="right")
+        return numpy.append(ack_time, numpy.inf)[index]
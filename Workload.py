@@ -0,0 +1,105 @@
+# Traffic workloads for the TCP sender.
+#
+# Each workload is a sending application with a send queue (see
+# BulkSendingApplication in Applications.py) whose messages arrive
+# according to a traffic model:
+#   - PoissonWorkload: batches of "size" messages with exponential inter-arrival times
+#   - OnOffWorkload: bursts at "rate" messages per unit of time during exponential
+#     on periods, separated by exponential off periods
+#   - ParetoWorkload: flows arriving as a Poisson process, each bringing a
+#     heavy-tailed (Pareto) number of messages
+#   - TraceWorkload: replays the arrivals recorded in a CSV file, read row by
+#     row while the simulation runs
+#
+# The random draws come from the workload's own random stream (see RandomStreams.py):
+#
+#   app = PoissonWorkload(env, rate=0.5, rng=streams.stream("WORKLOAD"))
+#   app.tcp_sender = tcp_sender
+
+import csv
+import math
+from Applications import BulkSendingApplication
+from RandomStreams import RandomStreams
+
+class PoissonWorkload(BulkSendingApplication):
+
+    def __init__(self, env, rate=1.0, size=1, backlog=float("inf"), token_rate=None, bucket_size=1, rng=None):
+        # rate: arrivals per unit of time, size: messages per arrival
+        self.rate = rate
+        self.size = size
+        self.rng = rng if rng is not None else RandomStreams().stream("WORKLOAD")
+        super().__init__(env, backlog=backlog, token_rate=token_rate, bucket_size=bucket_size)
+
+    def arrivals(self):
+        while True:
+            yield self.env.timeout(self.rng.expovariate(self.rate))
+            self.enqueue(self.size)
+
+class OnOffWorkload(BulkSendingApplication):
+
+    def __init__(self, env, rate=4.0, on_time=10.0, off_time=30.0, backlog=float("inf"), token_rate=None, bucket_size=1, rng=None):
+        # rate: messages per unit of time during the on periods
+        # on_time, off_time: mean durations of the on and off periods
+        self.rate = rate
+        self.on_time = on_time
+        self.off_time = off_time
+        self.rng = rng if rng is not None else RandomStreams().stream("WORKLOAD")
+        super().__init__(env, backlog=backlog, token_rate=token_rate, bucket_size=bucket_size)
+
+    def arrivals(self):
+        interval = 1.0 / self.rate
+        while True:
+            yield self.env.timeout(self.rng.expovariate(1.0 / self.off_time))
+            # Burst of messages until the end of the on period
+            end = self.env.now + self.rng.expovariate(1.0 / self.on_time)
+            while self.env.now + interval <= end:
+                yield self.env.timeout(interval)
+                self.enqueue(1)
+            yield self.env.timeout(end - self.env.now)
+
+class ParetoWorkload(BulkSendingApplication):
+
+    def __init__(self, env, flow_rate=0.05, shape=1.5, min_size=4, backlog=float("inf"), token_rate=None, bucket_size=1, rng=None):
+        # flow_rate: flow arrivals per unit of time
+        # shape, min_size: Pareto distribution of the flow sizes (messages);
+        # with shape <= 2 the variance is infinite, with shape <= 1 so is the mean
+        self.flow_rate = flow_rate
+        self.shape = shape
+        self.min_size = min_size
+        self.rng = rng if rng is not None else RandomStreams().stream("WORKLOAD")
+        self.flow_sizes = [] # size of every flow, in order of arrival
+        super().__init__(env, backlog=backlog, token_rate=token_rate, bucket_size=bucket_size)
+
+    def arrivals(self):
+        while True:
+            yield self.env.timeout(self.rng.expovariate(self.flow_rate))
+            size = math.ceil(self.min_size * self.rng.paretovariate(self.shape))
+            self.flow_sizes.append(size)
+            self.enqueue(size)
+
+class TraceWorkload(BulkSendingApplication):
+
+    def __init__(self, env, path, time_scale=1.0, backlog=float("inf"), token_rate=None, bucket_size=1, rng=None):
+        # path: CSV file with one arrival per row: time[,messages] (a header row is skipped)
+        # time_scale: factor applied to the recorded times
+        # (rng is not used: the replay is deterministic)
+        self.path = path
+        self.time_scale = time_scale
+        super().__init__(env, backlog=backlog, token_rate=token_rate, bucket_size=bucket_size)
+
+    def arrivals(self):
+        # The trace is read lazily, one row at a time, so it never has to fit in memory
+        with open(self.path, newline="") as f:
+            for row in csv.reader(f):
+                try:
+                    at = float(row[0]) * self.time_scale
+                except (ValueError, IndexError):
+                    # Header or empty row
+                    continue
+                count = int(row[1]) if len(row) > 1 and row[1] else 1
+                if at > self.env.now:
+                    yield self.env.timeout(at - self.env.now)
+                self.enqueue(count)
+
+# Workloads by name, for Simulation(workload=...)
+WORKLOADS = {"poisson": PoissonWorkload, "onoff": OnOffWorkload, "pareto": ParetoWorkload, "trace": TraceWorkload}
@@ -0,0 +1,154 @@
+# Benchmark suite for the speed of the simulator itself.
+#
+# Runs the Testbench topology (one flow) or the shared bottleneck topology
+# (several flows) until a given number of messages has been delivered, for
+# every combination of scale, number of flows, algorithm and event kernel
+# backend (SimPy or the lightweight kernel of Kernel.py), and reports:
+#   - events/sec: events processed per second of wall-clock time
+#   - packets/sec: DATA packets sent by the TCP senders per second of wall-clock time
+#   - peak RSS of the process running the case
+#   - retained blocks/packet: memory blocks allocated during the run and still
+#     alive at its end, per packet (what the run keeps, e.g. recorded metrics;
+#     blocks allocated and freed during the run are not counted). This stands
+#     in for allocations/packet, which CPython does not count: the output
+#     labels it as retained blocks, not allocations.
+#   - (with --trace-allocations) peak traced memory per packet, measured with tracemalloc
+#
+# Each case runs in a fresh process, so that the peak RSS belongs to that
+# case only. The results are saved as JSON, and can be compared with a
+# previous result file to catch regressions:
+#
+#   python -m benchmark --packets 1000 100000 --flows 1 10 -o bench.json
+#   python -m benchmark --packets 1000 100000 --flows 1 10 --compare bench.json
+#   python -m benchmark --packets 100000 --flows 1 --backend simpy kernel
+#   python -m benchmark --packets 100000 --flows 1 --batch-delivery
+
+import argparse
+import itertools
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import simpy
+import Logger
+import Kernel
+from CongestionControl import ALGORITHMS
+from Simulation import Simulation, MultiFlowSimulation
+
+def run_case(case):
+    # Run a single benchmark case and return its measurements.
+    # Executed in a fresh worker process.
+    Logger.configure(level=Logger.OFF)
+    packets, flows, algorithm, trace_allocations = case["packets"], case["flows"], case["algorithm"], case["trace_allocations"]
+    env = Kernel.make_environment(case["backend"])
+    batch_delivery = case.get("batch_delivery", False)
+    if trace_allocations:
+        tracemalloc.start()
+    blocks_before = sys.getallocatedblocks()
+    start = time.perf_counter()
+
+    if flows == 1:
+        sim = Simulation(algorithm=algorithm, seed=1, env=env, batch_delivery=batch_delivery)
+        sim.run(until=float("inf"), max_messages=packets)
+        senders = [sim.tcp_sender]
+        delivered = sim.receiving_app.total_messages_received
+    else:
+        # Enough capacity for all the flows, with a buffer that still fills up
+        sim = MultiFlowSimulation([algorithm] * flows, transmission_rate=16 * flows, buffer_size=max(8, flows), seed=1, env=env, batch_delivery=batch_delivery)
+        apps = [flow[3] for flow in sim.flows]
+        delivered = 0
+        while delivered < packets:
+            env.run(until=env.now + 100)
+            delivered = sum(app.total_messages_received for app in apps)
+        senders = [flow[1] for flow in sim.flows]
+
+    elapsed = time.perf_counter() - start
+    blocks_after = sys.getallocatedblocks()
+    packets_sent = sum(sender.total_packets_sent for sender in senders)
+    result = dict(case)
+    result.update({
+        "wall_time": elapsed,
+        "sim_time": env.now,
+        "events": env.events_processed,
+        "events_per_sec": env.events_processed / elapsed,
+        "messages_delivered": delivered,
+        "packets_sent": packets_sent,
+        "packets_per_sec": packets_sent / elapsed,
+        # ru_maxrss is in kilobytes on Linux, in bytes on macOS
+        "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024),
+        "retained_blocks_per_packet": (blocks_after - blocks_before) / packets_sent,
+    })
+    if trace_allocations:
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["traced_peak_bytes_per_packet"] = peak / packets_sent
+    return result
+
+def code_version():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmarks(packets, flows, algorithms, trace_allocations=False, backends=("simpy",), batch_delivery=False):
+    cases = [{"packets": p, "flows": f, "algorithm": a, "backend": b, "batch_delivery": batch_delivery, "trace_allocations": trace_allocations}
+             for p, f, a, b in itertools.product(packets, flows, algorithms, backends)]
+    results = []
+    # One case at a time, each in a fresh process, so that timings and peak RSS are not mixed up
+    for case in cases:
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            result = pool.submit(run_case, case).result()
+        print("%(algorithm)s packets=%(packets)d flows=%(flows)d backend=%(backend)s batch_delivery=%(batch_delivery)s: "
+              "%(events_per_sec).0f events/s, %(packets_per_sec).0f packets/s, peak RSS %(peak_rss_bytes)d bytes, "
+              "%(retained_blocks_per_packet).2f retained blocks/packet (live at the end of the run, not allocations)" % result, file=sys.stderr)
+        results.append(result)
+    return {
+        "code_version": code_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "simpy": simpy.__version__,
+        "results": results,
+    }
+
+def compare(report, baseline):
+    # Print the speed-up of every case over the same case in the baseline report
+    key = lambda r: (r["packets"], r["flows"], r["algorithm"], r.get("backend", "simpy"), r.get("batch_delivery", False))
+    previous = {key(r): r for r in baseline["results"]}
+    for result in report["results"]:
+        old = previous.get(key(result))
+        if old is None:
+            continue
+        print("%s packets=%d flows=%d backend=%s batch_delivery=%s: events/s x%.2f, packets/s x%.2f, peak RSS x%.2f" % (
+            result["algorithm"], result["packets"], result["flows"], result["backend"], result.get("batch_delivery", False),
+            result["events_per_sec"] / old["events_per_sec"],
+            result["packets_per_sec"] / old["packets_per_sec"],
+            result["peak_rss_bytes"] / old["peak_rss_bytes"]))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="benchmark", description="Measure the speed of the TCP congestion control simulator.")
+    parser.add_argument("--packets", nargs="+", default=[1000, 10000], type=lambda v: int(float(v)), help="delivered messages per run (e.g. 1e3 1e5)")
+    parser.add_argument("--flows", nargs="+", default=[1, 10], type=int)
+    parser.add_argument("--algorithm", nargs="+", default=sorted(ALGORITHMS), type=str.upper, choices=sorted(ALGORITHMS))
+    parser.add_argument("--backend", nargs="+", default=["simpy"], choices=sorted(Kernel.BACKENDS), help="event kernel(s) to benchmark")
+    parser.add_argument("--batch-delivery", action="store_true", help="deliver the packets arriving together at once (see Channel.py)")
+    parser.add_argument("--trace-allocations", action="store_true", help="also measure the traced memory per packet (slower)")
+    parser.add_argument("-o", "--output", default=None, help="JSON file for the results")
+    parser.add_argument("--compare", default=None, help="JSON results of a previous run to compare with")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.packets, args.flows, args.algorithm, args.trace_allocations, args.backend, args.batch_delivery)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,283 @@
+# Headless batch runner for the TCP congestion control simulation.
+#
+# Runs every combination of the given parameter values on a process pool
+# and writes one results table (CSV), with one row per run:
+#
+#   python -m tcpsim --algorithm AIMD MIMD --bandwidth 50 100 --seed 1 2 3 -o results.csv
+#
+# With --engine fluid, the whole grid is screened at once with the vectorized
+# fluid model (FluidModel.py) instead of the packet-level simulation.
+#
+# With --cache DIR, the results of the packet-level runs are kept in an
+# on-disk cache (RunCache.py), so re-running a sweep only simulates the
+# configurations (or algorithms) that changed.
+#
+# With --trace DIR, every packet-level run writes its per-packet events to a
+# columnar trace (Trace.py) in DIR, named after the values of the swept parameters.
+#
+# With --metrics-port PORT (or --metrics-socket PATH), every worker serves the
+# live metrics of its current run in the Prometheus text format (LiveMetrics.py),
+# on the first free port from PORT on (or on PATH, where {pid} is replaced by
+# the process id of the worker).
+
+import argparse
+import csv
+import functools
+import itertools
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import Logger
+from CongestionControl import ALGORITHMS
+from Simulation import Simulation
+from Kernel import BACKENDS
+from Metrics import MODES
+from RunCache import RunCache
+from LiveMetrics import LiveMetrics
+from SteadyState import SteadyStateDetector
+from Workload import WORKLOADS
+
+# Parameters that can be swept, in the order of the grid
+GRID_PARAMETERS = ["algorithm", "bandwidth", "propagation_delay", "timeout_value", "packet_length", "seed"]
+
+# Options of the packet-level simulation that the fluid model does not model
+FLUID_UNSUPPORTED = ["transmission_rate", "backlog", "saturate", "token_rate", "bucket_size", "workload", "workload_param",
+                     "rcv_window", "ack_every", "ack_delay", "batch_delivery", "recording", "recording_param", "steady_state",
+                     "backend", "trace", "metrics_port", "metrics_socket", "cache"]
+
+# Configuration columns of the results table, in the order of Simulation.config
+CONFIG_COLUMNS = ["algorithm", "bandwidth", "propagation_delay", "transmission_rate", "timeout_value", "packet_length", "sending_interval", "seed",
+                  "backlog", "token_rate", "bucket_size", "workload", "workload_params", "rcv_window", "ack_every", "ack_delay", "batch_delivery", "backend",
+                  "recording", "trace"]
+
+# Live metrics of the runs of this process (started by start_live_metrics)
+live_metrics = None
+
+def start_live_metrics(address):
+    # Serve the live metrics of this process on address ("port" or "socket")
+    global live_metrics
+    if live_metrics is not None:
+        return
+    live_metrics = LiveMetrics()
+    if address.get("socket") is not None:
+        where = live_metrics.serve_unix(address["socket"].format(pid=os.getpid()))
+    else:
+        for port in range(address["port"], address["port"] + 256):
+            try:
+                host, port = live_metrics.serve_http(port=port)
+                break
+            except OSError:
+                continue
+        else:
+            raise OSError("No free port for the live metrics from %d" % address["port"])
+        where = "http://%s:%d/metrics" % (host, port)
+    print("live metrics of process %d: %s" % (os.getpid(), where), file=sys.stderr)
+
+def run_config(config):
+    # Run a single configuration and return its summary.
+    # Executed in the worker processes, so it must stay at module level.
+    Logger.configure(level=Logger.OFF)
+    config = dict(config)
+    until = config.pop("until")
+    max_messages = config.pop("max_messages")
+    precision = config.pop("steady_state", None)
+    trace = config.pop("trace", None)
+    sim = Simulation(trace=trace, **config)
+    if live_metrics is not None:
+        live_metrics.attach(sim, labels={name: config[name] for name in GRID_PARAMETERS})
+    try:
+        if precision is None:
+            sim.run(until=until, max_messages=max_messages)
+            return sim.summary()
+
+        # Run until the metrics are stable, "until" being only an upper bound
+        detector = SteadyStateDetector(precision=precision)
+        sim.run(until=until, max_messages=None, stop_when=detector)
+        result = sim.summary()
+        result.update(detector.report())
+        return result
+    finally:
+        sim.close()
+
+def run_config_cached(config, cache):
+    # Run a configuration and store its summary in the cache
+    result = run_config(config)
+    cache.put(cache.key(config), result)
+    return result
+
+def workload_param(text):
+    # KEY=VALUE, with a numeric value when possible (e.g. rate=0.5, path=trace.csv)
+    key, sep, value = text.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError("expected KEY=VALUE, got %r" % text)
+    try:
+        value = float(value)
+        if value.is_integer():
+            value = int(value)
+    except ValueError:
+        pass
+    return key.replace("-", "_"), value
+
+def expand_grid(grid, **common):
+    # Cartesian product of the swept parameters, each merged with the common ones
+    names = list(grid)
+    configs = []
+    for values in itertools.product(*(grid[name] for name in names)):
+        config = dict(common)
+        config.update(zip(names, values))
+        configs.append(config)
+    return configs
+
+def run_grid(configs, workers=None, cache=None, metrics=None):
+    # Runs are independent, so fan them out over all the cores.
+    # With a cache, only the configurations without a cached result are run.
+    # With a metrics address, every process running configurations serves their live metrics.
+    results = [None] * len(configs)
+    if cache is not None:
+        results = [cache.get(cache.key(config)) for config in configs]
+    missing = [i for i, result in enumerate(results) if result is None]
+    run = run_config if cache is None else functools.partial(run_config_cached, cache=cache)
+    if workers == 1 or len(missing) <= 1:
+        if metrics is not None and missing:
+            start_live_metrics(metrics)
+        fresh = [run(configs[i]) for i in missing]
+    else:
+        initializer = start_live_metrics if metrics is not None else None
+        with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=(metrics,)) as pool:
+            fresh = list(pool.map(run, [configs[i] for i in missing]))
+    for i, result in zip(missing, fresh):
+        results[i] = result
+    if cache is not None:
+        cache.evict()
+    return results
+
+def run_grid_fluid(configs):
+    # All the configurations are evaluated in a single vectorized call.
+    # Every configuration draws from the random stream of its own seed.
+    from FluidModel import run_fluid
+    columns = {name: [config[name] for config in configs] for name in configs[0]}
+    result = run_fluid(
+        columns["algorithm"], bandwidth=columns["bandwidth"], propagation_delay=columns["propagation_delay"],
+        timeout_value=columns["timeout_value"], packet_length=columns["packet_length"],
+        sending_interval=columns["sending_interval"], until=configs[0]["until"],
+        max_messages=configs[0]["max_messages"], seed=columns["seed"])
+    results = []
+    for i, config in enumerate(configs):
+        row = {name: config.get(name) for name in CONFIG_COLUMNS}
+        row.update({
+            "sim_time": float(result.sim_time[i]),
+            "messages_received": int(result.messages_received[i]),
+            "packets_sent": int(result.packets_sent[i]),
+            "retransmissions": int(result.retransmissions[i]),
+            "retransmission_pct": float(result.retransmission_pct[i]),
+            "throughput": float(result.throughput[i]),
+            "final_cwnd": float(result.cwnd[-1, i]),
+        })
+        results.append(row)
+    return results
+
+def write_results(results, output):
+    if not results:
+        return
+    stream = sys.stdout if output == "-" else open(output, "w", newline="")
+    try:
+        writer = csv.DictWriter(stream, fieldnames=list(results[0]))
+        writer.writeheader()
+        writer.writerows(results)
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="tcpsim", description="Run a grid of TCP congestion control simulations.")
+    parser.add_argument("--algorithm", nargs="+", default=["AIMD"], type=str.upper, choices=sorted(ALGORITHMS))
+    parser.add_argument("--bandwidth", nargs="+", default=[100], type=float)
+    parser.add_argument("--propagation-delay", nargs="+", default=[2], type=float)
+    parser.add_argument("--timeout-value", nargs="+", default=[5], type=float)
+    parser.add_argument("--packet-length", nargs="+", default=[16], type=int)
+    parser.add_argument("--seed", nargs="+", default=[1], type=int)
+    parser.add_argument("--transmission-rate", default=1000, type=float)
+    parser.add_argument("--sending-interval", default=1, type=float)
+    parser.add_argument("--backlog", default=None, type=int, help="send queue of the application (messages), filled in one call as the window opens")
+    parser.add_argument("--saturate", action="store_true", help="keep the send queue always full (bulk transfer, requires --backlog)")
+    parser.add_argument("--token-rate", default=None, type=float, help="token bucket rate of the application (messages per unit of time)")
+    parser.add_argument("--bucket-size", default=1, type=int, help="token bucket depth (messages)")
+    parser.add_argument("--rcv-window", default=1024, type=int, help="receive window of the receiver (packets)")
+    parser.add_argument("--ack-every", default=1, type=float, help="delayed ACKs: one ACK every this many in-order packets (inf: coalesce the packets arriving together)")
+    parser.add_argument("--ack-delay", default=1, type=float, help="delayed ACKs: maximum delay of an ACK")
+    parser.add_argument("--recording", default="reservoir", choices=MODES,
+                        help="recording mode of the cwnd and utilization series (the tables do not use them, so a bounded mode by default)")
+    parser.add_argument("--recording-param", action="append", default=[], type=workload_param, metavar="KEY=VALUE",
+                        help="option of the recording mode (every, bucket, capacity), can be repeated")
+    parser.add_argument("--batch-delivery", action="store_true", help="deliver the packets arriving together at once, with one cumulative ACK")
+    parser.add_argument("--workload", default=None, choices=sorted(WORKLOADS), help="traffic model of the sending application")
+    parser.add_argument("--workload-param", action="append", default=[], type=workload_param, metavar="KEY=VALUE",
+                        help="parameter of the workload (e.g. rate=0.5), can be repeated")
+    parser.add_argument("--until", default=1000, type=float, help="total simulation time of each run")
+    parser.add_argument("--max-messages", default=1000, type=int, help="halt a run after this many delivered messages")
+    parser.add_argument("--steady-state", default=None, type=float, metavar="PRECISION",
+                        help="stop each run once cwnd, throughput and loss rate are known within this relative precision (e.g. 0.05); "
+                             "--until becomes an upper bound and --max-messages is ignored")
+    parser.add_argument("--backend", default="simpy", choices=sorted(BACKENDS), help="event kernel of the packet-level simulation")
+    parser.add_argument("--engine", default="packet", choices=["packet", "fluid"], help="packet-level simulation or vectorized fluid model")
+    parser.add_argument("--trace", default=None, metavar="DIR", help="write a per-packet event trace of every run in this directory")
+    parser.add_argument("--metrics-port", default=None, type=int, metavar="PORT",
+                        help="serve the live metrics of the runs over HTTP (Prometheus text format), one port per worker from PORT on")
+    parser.add_argument("--metrics-socket", default=None, metavar="PATH",
+                        help="serve the live metrics over a Unix socket instead ({pid} is replaced by the worker's process id)")
+    parser.add_argument("--cache", default=None, metavar="DIR", help="directory of the run-result cache (disabled by default)")
+    parser.add_argument("--cache-size", default=1024, type=float, metavar="MB", help="maximum size of the cache, least recently used results are evicted")
+    parser.add_argument("-j", "--workers", default=None, type=int, help="number of worker processes (default: all cores)")
+    parser.add_argument("-o", "--output", default="-", help="CSV file for the results table (default: stdout)")
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.saturate and args.backlog is None:
+        parser.error("--saturate requires --backlog")
+    if args.engine == "fluid":
+        from FluidModel import FLUID_ALGORITHMS
+        unsupported = sorted(set(args.algorithm) - set(FLUID_ALGORITHMS))
+        if unsupported:
+            parser.error("the fluid model does not implement %s (available: %s)" % (", ".join(unsupported), ", ".join(FLUID_ALGORITHMS)))
+        ignored = [name for name in FLUID_UNSUPPORTED if getattr(args, name) != parser.get_default(name)]
+        if ignored:
+            parser.error("the fluid model does not support %s" % ", ".join("--" + name.replace("_", "-") for name in ignored))
+    if args.metrics_socket is not None and "{pid}" not in args.metrics_socket and args.workers != 1:
+        parser.error("--metrics-socket needs a {pid} placeholder unless the runs use a single worker (-j 1)")
+    if args.trace is not None and args.cache is not None:
+        parser.error("--trace cannot be combined with --cache (a cached run writes no trace)")
+    grid = {name: getattr(args, name) for name in GRID_PARAMETERS}
+    configs = expand_grid(grid, transmission_rate=args.transmission_rate,
+                          sending_interval=None if args.saturate else args.sending_interval,
+                          backlog=args.backlog, token_rate=args.token_rate, bucket_size=args.bucket_size,
+                          workload=args.workload, workload_params=dict(args.workload_param) or None,
+                          rcv_window=args.rcv_window,
+                          ack_every=int(args.ack_every) if args.ack_every != float("inf") else args.ack_every, ack_delay=args.ack_delay,
+                          batch_delivery=args.batch_delivery,
+                          recording=dict(args.recording_param, mode=args.recording),
+                          backend=args.backend,
+                          until=args.until, max_messages=args.max_messages)
+    if args.steady_state is not None:
+        for config in configs:
+            config["steady_state"] = args.steady_state
+    if args.trace is not None:
+        for config in configs:
+            config["trace"] = os.path.join(args.trace, "-".join(str(config[name]) for name in GRID_PARAMETERS))
+    if args.engine == "fluid":
+        results = run_grid_fluid(configs)
+    else:
+        cache = RunCache(args.cache, max_bytes=int(args.cache_size * 2**20)) if args.cache else None
+        metrics = None
+        if args.metrics_port is not None or args.metrics_socket is not None:
+            metrics = {"port": args.metrics_port, "socket": args.metrics_socket}
+        results = run_grid(configs, workers=args.workers, cache=cache, metrics=metrics)
+        if cache is not None:
+            print("cache: %d hits, %d misses" % (cache.hits, cache.misses), file=sys.stderr)
+    write_results(results, args.output)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,18 @@
+# The modules live at the top of the repository
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+import Logger
+
+@pytest.fixture(autouse=True)
+def quiet_logger():
+    # The simulations log every event on stdout by default: keep the tests
+    # quiet, and restore the shared logger afterwards
+    level, sinks = Logger.logger.level, Logger.logger.sinks
+    Logger.configure(level=Logger.OFF)
+    yield
+    Logger.logger.sinks = sinks
+    Logger.logger.set_level(level)
@@ -0,0 +1,69 @@
+from Channel import UnreliableChannel
+from Kernel import make_environment
+from Packet import Packet
+from Simulation import Simulation
+from Trace import TraceReader
+from test_receiver import receiver
+
+class RecordingReceiver(object):
+    def __init__(self):
+        self.batches = []
+
+    def tcp_rcv_batch(self, packets):
+        self.batches.append([packt.seq_num for packt in packets])
+
+def test_channel_groups_packets_arriving_together():
+    env = make_environment("kernel")
+    channel = UnreliableChannel(env, "DATA_CHANNEL", propagation_delay=2, transmission_rate=1000, bandwidth=100, batch_delivery=True)
+    channel.rng.random = lambda: 1.0 # no loss
+    channel.receiver = RecordingReceiver()
+    for seq_num in (1, 17, 33):
+        channel.udt_send(Packet(seq_num=seq_num, payload=None, packet_length=16), 1, 1)
+    env.call_later(1, channel.udt_send, Packet(seq_num=49, payload=None, packet_length=16), 1, 1)
+    env.run()
+    assert channel.receiver.batches == [[1, 17, 33], [49]]
+
+def test_receiver_acknowledges_a_batch_once():
+    r = receiver()
+    r.tcp_rcv_batch([Packet(seq_num=seq_num, payload=seq_num, packet_length=16) for seq_num in (1, 17, 33)])
+    assert [ack.seq_num for ack in r.channel.sent] == [49]
+    assert r.receiving_app.delivered == [1, 17, 33]
+
+def test_simulation_with_batch_delivery():
+    sim = Simulation(algorithm="CUBIC", seed=1, batch_delivery=True, backend="kernel")
+    sim.run(until=300, max_messages=10000)
+    result = sim.summary()
+    assert result["batch_delivery"]
+    assert result["messages_received"] > 0
+    assert sim.tcp_sender.byte_counting
+
+def test_one_duplicate_ack_per_out_of_order_packet():
+    r = receiver()
+    r.tcp_rcv_batch([Packet(seq_num=seq_num, payload=seq_num, packet_length=16) for seq_num in (33, 49, 65)])
+    assert [ack.seq_num for ack in r.channel.sent] == [1, 1, 1]
+    assert r.num_retransmissions == 3
+
+def test_loss_in_a_batch_triggers_fast_retransmit(tmp_path):
+    sim = Simulation(algorithm="AIMD", sending_interval=None, backlog=64, bandwidth=10**9, seed=1,
+                     batch_delivery=True, backend="kernel", trace=str(tmp_path / "trace"))
+    data = sim.channel_for_data
+    for channel in (data, sim.channel_for_ack):
+        channel.rng.random = lambda: 1.0 # no random loss
+    lost = 20 * 16 + 1
+    dropped = []
+    udt_send = data.udt_send
+
+    def drop_once(packt, cwnd, RTT):
+        # Drop the first transmission of "lost", in the middle of a window
+        if packt.seq_num == lost and not dropped:
+            dropped.append(packt)
+            return
+        udt_send(packt, cwnd, RTT)
+
+    data.udt_send = drop_once
+    sim.run(until=100, max_messages=None)
+    sim.close()
+    trace = TraceReader(str(tmp_path / "trace"))
+    assert list(trace["seq"][trace.select("retransmit")]) == [lost]
+    assert not trace.select("timeout").any()
+    assert sim.receiving_app.total_messages_received > 30
@@ -0,0 +1,21 @@
+from Simulation import Simulation, MultiFlowSimulation
+
+def test_bbr_models_the_path():
+    sim = Simulation(algorithm="BBR", propagation_delay=2, seed=1)
+    phases = set()
+    sim.run(until=2000, max_messages=None, stop_when=lambda s: phases.add(s.tcp_sender.congestion_control.phase))
+    bbr = sim.tcp_sender.congestion_control
+    assert {bbr.STARTUP, bbr.PROBE_BW} <= phases
+    # The sending application offers one 16-bit message per unit of time
+    assert bbr.btl_bw == 16
+    assert bbr.min_rtt == 4
+    assert sim.tcp_sender.pacing_rate is not None
+
+def test_bbr_keeps_the_queue_shorter_than_aimd():
+    def queueing_delay(algorithm):
+        sim = MultiFlowSimulation([algorithm], transmission_rate=16, buffer_size=16, sending_interval=0.5, seed=1)
+        sim.run(until=5000)
+        summary = sim.summary()
+        assert summary["utilization"] > 0.98
+        return summary["mean_queueing_delay"]
+    assert queueing_delay("BBR") < queueing_delay("AIMD") / 2
@@ -0,0 +1,35 @@
+import pytest
+import benchmark
+
+def case(**kwargs):
+    return dict({"packets": 200, "flows": 1, "algorithm": "AIMD", "trace_allocations": False, "backend": "simpy"}, **kwargs)
+
+@pytest.mark.parametrize("flows", [1, 3])
+def test_run_case(flows):
+    result = benchmark.run_case(case(flows=flows))
+    assert result["messages_delivered"] >= 200
+    assert result["events"] > result["packets_sent"] > 0
+    assert result["events_per_sec"] > 0
+    assert result["peak_rss_bytes"] > 0
+    assert "retained_blocks_per_packet" in result
+
+def test_trace_allocations():
+    assert benchmark.run_case(case(trace_allocations=True))["traced_peak_bytes_per_packet"] > 0
+
+def test_compare(capsys):
+    result = benchmark.run_case(case())
+    slower = dict(result, events_per_sec=result["events_per_sec"] / 2, packets_per_sec=result["packets_per_sec"] / 2)
+    benchmark.compare({"results": [result]}, {"results": [slower]})
+    assert "events/s x2.00, packets/s x2.00" in capsys.readouterr().out
+
+def test_compare_keeps_batch_delivery_apart(capsys):
+    result = benchmark.run_case(case())
+    batched = dict(result, batch_delivery=True, events_per_sec=result["events_per_sec"] * 2)
+    benchmark.compare({"results": [result]}, {"results": [batched]})
+    assert capsys.readouterr().out == ""
+    benchmark.compare({"results": [batched]}, {"results": [batched]})
+    assert "batch_delivery=True: events/s x1.00" in capsys.readouterr().out
+
+def test_output_labels_retained_blocks(capsys):
+    benchmark.run_benchmarks([200], [1], ["AIMD"])
+    assert "retained blocks/packet (live at the end of the run, not allocations)" in capsys.readouterr().err
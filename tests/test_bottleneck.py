@@ -0,0 +1,20 @@
+import pytest
+from Bottleneck import jain_fairness
+from Simulation import MultiFlowSimulation
+
+def test_jain_fairness():
+    assert jain_fairness([5, 5, 5, 5]) == 1
+    assert jain_fairness([8, 0, 0, 0]) == pytest.approx(1 / 4)
+    assert jain_fairness([0, 0]) == 1
+
+@pytest.mark.parametrize("drop_policy", ["droptail", "red", "codel"])
+def test_flows_share_the_link(drop_policy):
+    sim = MultiFlowSimulation(["AIMD"] * 4, transmission_rate=16, buffer_size=8, drop_policy=drop_policy, seed=1)
+    sim.run(until=500)
+    summary = sim.summary()
+    assert len(summary["flows"]) == 4
+    assert all(flow["messages_received"] > 0 for flow in summary["flows"])
+    assert summary["aggregate_throughput"] <= 16 + 1e-9
+    assert 0.25 <= summary["fairness"] <= 1
+    assert summary["packets_dropped"] > 0
+    assert max(sim.link.queue_length.columns["value"]) <= 8
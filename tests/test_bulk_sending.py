@@ -0,0 +1,44 @@
+import simpy
+from Applications import TokenBucket
+from Simulation import Simulation
+
+def test_token_bucket():
+    env = simpy.Environment()
+    bucket = TokenBucket(env, rate=2, bucket_size=4)
+    assert bucket.available() == 4
+    bucket.take(4)
+    assert bucket.available() == 0
+    assert bucket.delay() == 0.5
+    env.run(until=1)
+    assert bucket.available() == 2
+    env.run(until=10)
+    assert bucket.available() == 4
+
+def bulk_transfer(**kwargs):
+    sim = Simulation(algorithm="AIMD", sending_interval=None, backlog=64, seed=1, **kwargs)
+    sim.run(until=500, max_messages=None)
+    return sim
+
+def test_saturating_transfer_is_window_limited():
+    sim = bulk_transfer()
+    sender = sim.tcp_sender
+    # The send queue never drains: whatever the window allows has been sent
+    assert sim.sending_app.queued == 64
+    assert sender.nextseqnum - sender.sendbase + sender.data_packet_length > sender.cwnd
+
+def test_token_bucket_limits_the_rate():
+    sim = bulk_transfer(token_rate=0.2, bucket_size=2)
+    assert 0.9 * 100 < sim.sending_app.total_messages_sent <= 100 + 2
+    assert sim.sending_app.total_messages_sent < bulk_transfer().sending_app.total_messages_sent
+
+def test_full_send_queue_blocks_new_messages():
+    sim = Simulation(algorithm="AIMD", sending_interval=0.01, backlog=4, seed=1)
+    sim.run(until=100, max_messages=None)
+    assert sim.sending_app.messages_blocked > 0
+    assert sim.sending_app.queued <= 4
+
+def test_unbounded_saturating_transfer():
+    # An always-full queue behaves the same whatever its size
+    unbounded = Simulation(algorithm="AIMD", sending_interval=None, backlog=float("inf"), seed=1)
+    unbounded.run(until=500, max_messages=None)
+    assert unbounded.sending_app.total_messages_sent == bulk_transfer().sending_app.total_messages_sent > 0
@@ -0,0 +1,31 @@
+from Simulation import MultiFlowSimulation
+
+def run(drop_policy, **kwargs):
+    sim = MultiFlowSimulation(["AIMD"] * 8, transmission_rate=100, buffer_size=500, drop_policy=drop_policy,
+                              sending_interval=None, backlog=64, seed=1, backend="kernel", **kwargs)
+    sim.run(until=3000)
+    return sim
+
+def test_codel_parameters_follow_the_link():
+    codel = run("codel").link.drop_policy
+    assert codel.interval == 2 * 2 # base round trip time
+    assert codel.target == 0.05 * codel.interval
+
+def test_codel_keeps_queueing_delay_near_target():
+    codel = run("codel")
+    droptail = run("droptail")
+    target = codel.link.drop_policy.target
+    assert codel.summary()["mean_queueing_delay"] < 2 * target
+    assert droptail.summary()["mean_queueing_delay"] > 10 * target
+    assert codel.summary()["utilization"] > 0.95
+
+def test_codel_explicit_parameters():
+    codel = run("codel", drop_params={"target": 1, "interval": 8}).link.drop_policy
+    assert (codel.target, codel.interval) == (1, 8)
+
+def test_codel_target_follows_the_packet_length():
+    # 100-bit packets take 1 unit of time on the link, more than 5% of the interval
+    codel = run("codel", packet_length=100).link.drop_policy
+    assert codel.interval == 4
+    assert codel.target == 1
+    assert run("codel", packet_length=4).link.drop_policy.target == 0.05 * 4
@@ -0,0 +1,50 @@
+import pytest
+import simpy
+from CongestionControl import ALGORITHMS, SLOW_START, CONGESTION_AVOIDANCE, FAST_RECOVERY, get_congestion_control
+from TCP_Protocol import tcp_Sender
+import TCP_Protocol_WithCongestionControl_MIAD
+
+def sender(algorithm, cwnd, state):
+    sender = tcp_Sender(simpy.Environment(), algorithm)
+    sender.cwnd = cwnd
+    sender.state = state
+    return sender
+
+def test_registry():
+    assert {"AIMD", "AIAD", "MIAD", "MIMD"} <= set(ALGORITHMS)
+    assert get_congestion_control("aimd").name == "AIMD"
+    with pytest.raises(ValueError):
+        get_congestion_control("RENO")
+
+def test_additive_increase_grows_one_packet_per_window():
+    s = sender("AIMD", 64, CONGESTION_AVOIDANCE)
+    for _ in range(4):
+        s.congestion_control.on_ack(s)
+    assert s.cwnd == 80
+
+def test_multiplicative_increase():
+    s = sender("MIMD", 64, CONGESTION_AVOIDANCE)
+    s.congestion_control.on_ack(s)
+    assert s.cwnd == 72
+
+def test_three_dup_acks_halve_the_window():
+    s = sender("AIMD", 64, CONGESTION_AVOIDANCE)
+    assert [s.congestion_control.on_dup_ack(s) for _ in range(3)] == [False, False, True]
+    assert s.ssthresh == 32
+    assert s.cwnd == 32 + 3 * 16
+    assert s.state == FAST_RECOVERY
+
+def test_timeout_restarts_slow_start():
+    s = sender("MIAD", 64, CONGESTION_AVOIDANCE)
+    s.congestion_control.on_timeout(s)
+    assert (s.cwnd, s.ssthresh, s.state) == (16, 0.8 * 64, SLOW_START)
+
+def test_aiad_stays_in_slow_start():
+    s = sender("AIAD", 16, SLOW_START)
+    s.ssthresh = 32
+    s.congestion_control.on_ack(s)
+    assert s.state == SLOW_START
+
+def test_legacy_module_uses_its_algorithm():
+    s = TCP_Protocol_WithCongestionControl_MIAD.tcp_Sender(simpy.Environment())
+    assert s.congestion_control.name == "MIAD"
@@ -0,0 +1,52 @@
+import pytest
+import simpy
+from CongestionControl import CONGESTION_AVOIDANCE, FAST_RECOVERY
+from Simulation import Simulation
+from TCP_Protocol import tcp_Sender
+
+L = 16
+
+def cubic_sender(packets):
+    sender = tcp_Sender(simpy.Environment(), "CUBIC")
+    sender.cwnd = packets * L
+    sender.state = CONGESTION_AVOIDANCE
+    return sender
+
+def test_loss_reduces_the_window_by_beta():
+    sender = cubic_sender(100)
+    for _ in range(3):
+        sender.congestion_control.on_dup_ack(sender)
+    assert sender.state == FAST_RECOVERY
+    assert sender.ssthresh == pytest.approx(70 * L)
+    assert sender.congestion_control.w_max == 100
+
+def test_fast_convergence():
+    sender = cubic_sender(100)
+    cubic = sender.congestion_control
+    cubic.ssthresh_after_loss(sender)
+    sender.cwnd = 80 * L
+    cubic.ssthresh_after_loss(sender)
+    assert cubic.w_max == pytest.approx(80 * 1.7 / 2)
+
+def test_window_grows_back_to_w_max_around_K():
+    sender = cubic_sender(100)
+    cubic = sender.congestion_control
+    cubic.tcp_friendly = False
+    sender.cwnd = cubic.ssthresh_after_loss(sender)
+    sender.RTT = 1
+    windows = []
+    for t in range(1, 13):
+        sender.env.run(until=t)
+        for _ in range(int(sender.cwnd / L)):
+            cubic.on_ack(sender)
+        windows.append(sender.cwnd / L)
+    K = (30 / 0.4) ** (1 / 3)
+    # Concave below W_max, plateau around it at K, convex beyond
+    assert windows[int(K) - 1] == pytest.approx(100, rel=0.02)
+    assert windows[0] - 70 > windows[int(K) - 1] - windows[int(K) - 2]
+    assert windows[-1] > 101
+
+def test_simulation_with_cubic():
+    sim = Simulation(algorithm="CUBIC", seed=1)
+    sim.run(until=500)
+    assert sim.summary()["messages_received"] > 0
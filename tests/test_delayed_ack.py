@@ -0,0 +1,55 @@
+import simpy
+from CongestionControl import SLOW_START, CONGESTION_AVOIDANCE
+from Simulation import Simulation
+from TCP_Protocol import tcp_Sender
+from test_receiver import receiver, send
+
+def delayed_ack_receiver(ack_every=2, ack_delay=1):
+    r = receiver()
+    r.ack_every = ack_every
+    r.ack_delay = ack_delay
+    return r
+
+def test_one_ack_every_two_packets():
+    r = delayed_ack_receiver()
+    assert send(r, 1, 17, 33, 49) == [33, 65]
+
+def test_single_packet_is_acknowledged_after_the_delay():
+    r = delayed_ack_receiver()
+    assert send(r, 1) == []
+    r.env.run(until=2)
+    assert [ack.seq_num for ack in r.channel.sent] == [17]
+
+def test_out_of_order_packet_is_acknowledged_right_away():
+    r = delayed_ack_receiver()
+    assert send(r, 1, 33) == [1 + 16]
+    # Filling the hole is acknowledged right away too
+    assert send(r, 17) == [17, 49]
+
+def test_coalesced_acks():
+    r = delayed_ack_receiver(ack_every=float("inf"), ack_delay=0)
+    send(r, 1, 17, 33)
+    assert r.channel.sent == []
+    r.env.run(until=1)
+    assert [ack.seq_num for ack in r.channel.sent] == [49]
+
+def test_byte_counting():
+    sender = tcp_Sender(simpy.Environment(), "MIMD")
+    sender.byte_counting = True
+    sender.acked_segments = 3
+    sender.state = SLOW_START
+    sender.congestion_control.on_ack(sender)
+    assert sender.cwnd == 16 + 2 * 16 # at most 2 packets per ACK in slow start
+    sender.state = CONGESTION_AVOIDANCE
+    sender.cwnd = 64
+    sender.congestion_control.on_ack(sender)
+    assert sender.cwnd == 64 * 1.125 ** 3
+
+def test_fewer_acks_on_the_reverse_path():
+    def acks(ack_every):
+        sim = Simulation(algorithm="AIMD", ack_every=ack_every, seed=1)
+        sim.run(until=1000, max_messages=None)
+        return sim.tcp_receiver.total_packets_sent, sim.receiving_app.total_messages_received
+    (immediate, delivered), (delayed, delivered_delayed) = acks(1), acks(2)
+    assert delayed < 0.85 * immediate
+    assert delivered_delayed > 0.9 * delivered
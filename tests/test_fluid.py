@@ -0,0 +1,51 @@
+import csv
+import numpy
+import pytest
+import tcpsim
+from FluidModel import run_fluid
+
+def test_parameters_are_broadcast():
+    result = run_fluid(["AIMD", "MIMD"], bandwidth=[[50], [100]], until=200, seed=1)
+    assert result.throughput.shape == (2, 2)
+    assert result.cwnd.shape[1:] == (2, 2)
+    assert (result.sim_time >= 200).all()
+
+def test_reproducible():
+    first = run_fluid(["AIMD", "AIAD", "MIAD", "MIMD"], until=500, seed=3)
+    second = run_fluid(["AIMD", "AIAD", "MIAD", "MIMD"], until=500, seed=3)
+    assert numpy.array_equal(first.cwnd, second.cwnd)
+
+def test_throughput_is_capped_by_the_application():
+    result = run_fluid("AIMD", sending_interval=[1, 2], until=1000, seed=1)
+    assert (result.throughput <= 1 / numpy.array([1, 2]) + 1e-9).all()
+    assert (result.messages_received > 0).all()
+
+def test_unknown_algorithm():
+    with pytest.raises(ValueError):
+        run_fluid("RENO")
+
+def test_tcpsim_fluid_engine(tmp_path):
+    output = str(tmp_path / "fluid.csv")
+    tcpsim.main(["--engine", "fluid", "--algorithm", "AIMD", "MIMD", "--bandwidth", "50", "100", "-o", output])
+    with open(output) as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 4
+    assert all(float(row["throughput"]) > 0 for row in rows)
+
+def test_row_does_not_depend_on_the_rest_of_the_grid():
+    alone = run_fluid("AIMD", seed=1, until=1000)
+    grid = run_fluid(["AIMD", "AIMD", "MIMD"], seed=[1, 2, 1], until=1000)
+    assert grid.messages_received[0] == alone.messages_received
+    assert grid.packets_sent[0] == alone.packets_sent
+    assert grid.messages_received[1] != alone.messages_received
+
+@pytest.mark.parametrize("argv", [
+    ["--engine", "fluid", "--algorithm", "CUBIC"],
+    ["--engine", "fluid", "--algorithm", "BBR"],
+    ["--engine", "fluid", "--ack-every", "2"],
+    ["--engine", "fluid", "--batch-delivery"],
+    ["--engine", "fluid", "--steady-state", "0.05"],
+])
+def test_fluid_engine_rejects_unsupported_options(argv):
+    with pytest.raises(SystemExit):
+        tcpsim.main(argv)
@@ -0,0 +1,93 @@
+import pytest
+import Kernel
+from Simulation import Simulation, MultiFlowSimulation
+from SteadyState import SteadyStateDetector
+
+def test_events_in_time_then_scheduling_order():
+    env = Kernel.Environment()
+    order = []
+    env.call_later(2, order.append, "b")
+    env.call_later(1, order.append, "a")
+    env.call_later(2, order.append, "c")
+    env.run()
+    assert order == ["a", "b", "c"]
+    assert env.now == 2
+    assert env.events_processed == 3
+
+def test_process_and_run_until():
+    env = Kernel.Environment()
+    ticks = []
+
+    def clock():
+        while True:
+            ticks.append(env.now)
+            yield env.timeout(1)
+
+    env.process(clock())
+    env.run(until=3)
+    # The events at the "until" time are not processed
+    assert ticks == [0, 1, 2]
+    assert env.now == 3
+
+def test_run_until_event():
+    env = Kernel.Environment()
+    done = env.event()
+    env.call_later(5, done.succeed, "done")
+    assert env.run(until=done) == "done"
+    assert env.now == 5
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        Kernel.make_environment("nope")
+
+# Every feature of the simulation, on both backends: the kernel is only kept
+# as long as it gives exactly the results of SimPy
+FEATURES = [
+    {},
+    {"sending_interval": None, "backlog": 64},
+    {"sending_interval": None, "backlog": 64, "token_rate": 0.5, "bucket_size": 4},
+    {"workload": "poisson", "workload_params": {"rate": 0.5}},
+    {"workload": "onoff"},
+    {"ack_every": 2},
+    {"sending_interval": None, "backlog": 64, "batch_delivery": True},
+    {"sending_interval": None, "backlog": 64, "rcv_window": 4},
+]
+
+@pytest.mark.parametrize("algorithm", ["AIMD", "CUBIC", "BBR"])
+@pytest.mark.parametrize("features", FEATURES)
+def test_simulation_identical_across_backends(algorithm, features):
+    results = []
+    for backend in ("simpy", "kernel"):
+        sim = Simulation(algorithm=algorithm, seed=1, backend=backend, **features)
+        sim.run(until=300, max_messages=10000)
+        result = sim.summary()
+        del result["backend"]
+        results.append(result)
+    assert results[0] == results[1]
+
+@pytest.mark.parametrize("drop_policy", ["droptail", "red", "codel"])
+def test_multiflow_identical_across_backends(drop_policy):
+    results = []
+    for backend in ("simpy", "kernel"):
+        sim = MultiFlowSimulation(["AIMD", "CUBIC", "BBR"], transmission_rate=16, buffer_size=8, drop_policy=drop_policy,
+                                  sending_interval=None, backlog=64, seed=1, backend=backend)
+        sim.run(until=300)
+        results.append(sim.summary())
+    assert results[0] == results[1]
+
+def test_steady_state_stop_identical_across_backends():
+    results = []
+    for backend in ("simpy", "kernel"):
+        sim = Simulation(algorithm="AIMD", seed=1, backend=backend)
+        detector = SteadyStateDetector(precision=0.1)
+        halt = sim.run(until=100000, max_messages=None, stop_when=detector)
+        results.append((halt, sim.env.now, detector.report()))
+    assert results[0] == results[1]
+
+def test_both_backends_count_the_same_events():
+    counts = []
+    for backend in ("simpy", "kernel"):
+        sim = Simulation(algorithm="AIMD", seed=1, backend=backend)
+        sim.run(until=300, max_messages=10000)
+        counts.append(sim.env.events_processed)
+    assert counts[0] == counts[1] > 0
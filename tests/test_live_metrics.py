@@ -0,0 +1,86 @@
+import http.client
+import socket
+from LiveMetrics import LiveMetrics, format_labels, format_value
+from Simulation import Simulation
+
+def render(algorithm, backend="simpy", labels=None):
+    sim = Simulation(algorithm=algorithm, seed=1, backend=backend)
+    metrics = LiveMetrics(labels=labels)
+    metrics.attach(sim)
+    sim.run(until=500)
+    metrics.update()
+    return sim, metrics
+
+def test_format():
+    assert format_value(float("inf")) == "+Inf"
+    assert format_value(float("nan")) == "NaN"
+    assert format_value(3) == "3"
+    assert format_labels({"run": 'a"b'}) == '{run="a\\"b"}'
+    assert format_labels({}) == ""
+
+def test_rendering():
+    sim, metrics = render("AIMD", backend="kernel", labels={"run": "aimd"})
+    text = metrics.text
+    assert "# TYPE tcpsim_packets_sent_total counter" in text
+    assert 'tcpsim_packets_sent_total{run="aimd",flow="0",algorithm="AIMD"} %d' % sim.tcp_sender.total_packets_sent in text
+    assert 'tcpsim_channel_utilization{run="aimd",channel="DATA_CHANNEL"}' in text
+    assert 'tcpsim_sim_time{run="aimd"} 500' in text
+    assert "tcpsim_events_per_second{" in text
+
+def test_http_scrape():
+    _, metrics = render("AIMD")
+    host, port = metrics.serve_http(port=0)
+    try:
+        connection = http.client.HTTPConnection(host, port, timeout=5)
+        connection.request("GET", "/metrics")
+        response = connection.getresponse()
+        assert response.status == 200
+        assert response.read().decode() == metrics.text
+        connection.request("GET", "/other")
+        response = connection.getresponse()
+        response.read()
+        assert response.status == 404
+    finally:
+        metrics.close()
+
+def test_unix_scrape(tmp_path):
+    _, metrics = render("AIMD")
+    path = metrics.serve_unix(str(tmp_path / "metrics.sock"))
+    try:
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.settimeout(5)
+        client.connect(path)
+        client.sendall(b"GET /metrics HTTP/1.0\r\n\r\n")
+        response = b""
+        while True:
+            chunk = client.recv(65536)
+            if not chunk:
+                break
+            response += chunk
+        client.close()
+        assert response.startswith(b"HTTP/1.0 200")
+        assert response.endswith(metrics.text.encode())
+    finally:
+        metrics.close()
+
+def test_bbr_exports_its_phase():
+    sim, metrics = render("BBR")
+    text = metrics.text
+    assert "tcpsim_state" not in text
+    phase = sim.tcp_sender.congestion_control.phase.lower()
+    assert 'tcpsim_phase{flow="0",algorithm="BBR",phase="%s"} 1' % phase in text
+    assert text.count("tcpsim_phase{") == 4
+    assert sum(line.endswith(" 1") for line in text.splitlines() if line.startswith("tcpsim_phase{")) == 1
+
+def test_loss_based_algorithm_exports_its_state():
+    _, metrics = render("AIMD")
+    text = metrics.text
+    assert "tcpsim_phase" not in text
+    assert text.count("tcpsim_state{") == 3
+    assert sum(line.endswith(" 1") for line in text.splitlines() if line.startswith("tcpsim_state{")) == 1
+
+def test_events_per_second_on_both_backends():
+    for backend in ("simpy", "kernel"):
+        sim, metrics = render("AIMD", backend=backend)
+        assert sim.env.events_processed > 0
+        assert "\ntcpsim_events_per_second " in metrics.text
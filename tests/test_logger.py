@@ -0,0 +1,29 @@
+import io
+import json
+import Logger
+from Logger import EventLogger, NDJSONSink, TextSink, DEBUG, INFO, WARNING
+
+def test_level_flags():
+    logger = EventLogger(level=INFO, sinks=[])
+    assert (logger.debug, logger.info, logger.warning, logger.error) == (False, True, True, True)
+
+def test_text_sink_drops_disabled_levels():
+    stream = io.StringIO()
+    logger = EventLogger(level=WARNING, sinks=[TextSink(stream)])
+    logger.log(INFO, 1, "TCP_SENDER", "ack", seq_num=17)
+    logger.log(WARNING, 2, "TCP_SENDER", "timeout", base=1)
+    assert stream.getvalue() == "TIME: 2 TCP_SENDER: timeout base=1\n"
+
+def test_ndjson_sink(tmp_path):
+    path = str(tmp_path / "events.ndjson")
+    logger = EventLogger(level=DEBUG, sinks=[NDJSONSink(path)])
+    logger.log(INFO, 1.5, "DATA_CHANNEL", "udt_send", seq_num=1)
+    logger.close()
+    with open(path) as f:
+        assert [json.loads(line) for line in f] == [
+            {"time": 1.5, "level": "INFO", "source": "DATA_CHANNEL", "event": "udt_send", "seq_num": 1}]
+
+def test_configure_keeps_the_shared_logger():
+    shared = Logger.logger
+    assert Logger.configure(level=DEBUG) is shared
+    assert shared.debug
@@ -0,0 +1,43 @@
+import pytest
+from Metrics import TimeSeries
+
+def record(series, samples):
+    for time, value in samples:
+        series.record(time, value)
+    return series
+
+def test_all_keeps_samples_at_the_same_time():
+    series = record(TimeSeries(), [(0, 1), (0, 2), (1, 3)])
+    assert list(series.columns["value"]) == [1, 2, 3]
+
+def test_every_n():
+    series = record(TimeSeries(mode="every_n", every=3), [(t, t) for t in range(10)])
+    assert list(series.columns["value"]) == [0, 3, 6, 9]
+    assert series.num_samples == 10
+
+def test_bucket():
+    series = record(TimeSeries(mode="bucket", bucket=2), [(0, 4), (1, 2), (2.5, 7)])
+    assert len(series) == 2
+    columns = series.finish()
+    assert list(columns["time"]) == [0, 2]
+    assert list(columns["min"]) == [2, 7]
+    assert list(columns["max"]) == [4, 7]
+    assert list(columns["mean"]) == [3, 7]
+    assert list(columns["count"]) == [2, 1]
+
+def test_reservoir_is_bounded_and_sorted():
+    series = record(TimeSeries(mode="reservoir", capacity=20, seed=1), [(t, t) for t in range(1000)])
+    assert len(series) == 20
+    times = list(series.finish()["time"])
+    assert times == sorted(times)
+
+def test_to_numpy_and_csv(tmp_path):
+    series = record(TimeSeries(), [(0, 16), (1, 32)])
+    assert series.to_numpy()["value"].tolist() == [16, 32]
+    path = tmp_path / "cwnd.csv"
+    series.to_csv(str(path))
+    assert path.read_text().splitlines() == ["time,value", "0.0,16.0", "1.0,32.0"]
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        TimeSeries(mode="sometimes")
@@ -0,0 +1,38 @@
+import pytest
+import simpy
+from Packet import Packet
+from TCP_Protocol import tcp_Receiver
+
+class RecordingChannel(object):
+
+    def __init__(self):
+        self.sent = []
+
+    def udt_send(self, packt, cwnd, RTT):
+        self.sent.append(packt)
+
+class RecordingApplication(object):
+
+    def __init__(self):
+        self.delivered = []
+
+    def deliver_data(self, data):
+        self.delivered.append(data)
+
+def test_packet_is_immutable_and_slotted():
+    packt = Packet(seq_num=1, payload="msg", packet_length=16)
+    assert not hasattr(packt, "__dict__")
+    with pytest.raises(AttributeError):
+        packt.seq_num = 17
+
+def test_duplicate_acks_reuse_the_last_ack():
+    receiver = tcp_Receiver(simpy.Environment())
+    receiver.channel = RecordingChannel()
+    receiver.receiving_app = RecordingApplication()
+    packt = Packet(seq_num=1, payload="msg", packet_length=16)
+    for _ in range(3):
+        receiver.tcp_rcv(packt)
+    first, *duplicates = receiver.channel.sent
+    assert first.seq_num == 17
+    assert all(ack is first for ack in duplicates)
+    assert receiver.receiving_app.delivered == ["msg"]
@@ -0,0 +1,25 @@
+from RandomStreams import RandomStreams
+from Simulation import Simulation
+
+def draws(stream, count=10):
+    return [stream.random() for _ in range(count)]
+
+def test_stream_depends_on_seed_and_name():
+    assert draws(RandomStreams(1).stream("DATA_CHANNEL")) == draws(RandomStreams(1).stream("DATA_CHANNEL"))
+    assert draws(RandomStreams(1).stream("DATA_CHANNEL")) != draws(RandomStreams(1).stream("ACK_CHANNEL"))
+    assert draws(RandomStreams(1).stream("DATA_CHANNEL")) != draws(RandomStreams(2).stream("DATA_CHANNEL"))
+
+def test_blocks_are_continuous():
+    small = RandomStreams(1, block_size=3).stream("DATA_CHANNEL")
+    large = RandomStreams(1, block_size=4096).stream("DATA_CHANNEL")
+    values = draws(small, 10)
+    assert values == draws(large, 10)
+    assert all(0 <= value < 1 for value in values)
+
+def test_simulation_is_reproducible():
+    def run(seed):
+        sim = Simulation(algorithm="AIMD", seed=seed)
+        sim.run(until=300)
+        return sim.summary()
+    assert run(3) == run(3)
+    assert run(3) != run(4)
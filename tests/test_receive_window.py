@@ -0,0 +1,23 @@
+from Simulation import Simulation, MultiFlowSimulation
+
+def test_sender_respects_advertised_window():
+    # A window far larger than the receiver's ring buffer
+    sim = Simulation(algorithm="MIMD", sending_interval=None, backlog=256, bandwidth=10**9, rcv_window=4, seed=1)
+    receiver, sender = sim.tcp_receiver, sim.tcp_sender
+    sim.run(until=2000, max_messages=None)
+
+    L = sender.data_packet_length
+    assert sim.summary()["rcv_window"] == 4
+    assert max(sim.channel_for_data.cwnd_values.columns["value"]) > receiver.rcv_window * L
+    assert sender.rwnd == receiver.rcv_window * L
+    assert receiver.window_drops == 0
+    assert sim.receiving_app.total_messages_received > 100
+
+def test_multiflow_receive_window():
+    sim = MultiFlowSimulation(["MIMD"] * 2, sending_interval=None, backlog=256, rcv_window=4, seed=1)
+    sim.run(until=500)
+    for _, sender, receiver, receiving_app in sim.flows:
+        assert len(receiver.rcvbuf) == 4
+        assert sender.rwnd == 4 * sender.data_packet_length
+        assert receiver.window_drops == 0
+        assert receiving_app.total_messages_received > 0
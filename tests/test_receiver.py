@@ -0,0 +1,39 @@
+import simpy
+from Packet import Packet
+from TCP_Protocol import tcp_Receiver
+from test_packet import RecordingApplication, RecordingChannel
+
+def receiver(rcv_window=1024):
+    receiver = tcp_Receiver(simpy.Environment(), rcv_window=rcv_window)
+    receiver.channel = RecordingChannel()
+    receiver.receiving_app = RecordingApplication()
+    return receiver
+
+def send(receiver, *seq_nums):
+    for seq_num in seq_nums:
+        receiver.tcp_rcv(Packet(seq_num=seq_num, payload=seq_num, packet_length=16))
+    return [ack.seq_num for ack in receiver.channel.sent]
+
+def test_out_of_order_packets_are_delivered_in_order():
+    r = receiver()
+    assert send(r, 17, 33, 1) == [1, 1, 49]
+    assert r.receiving_app.delivered == [1, 17, 33]
+
+def test_packets_beyond_the_window_are_dropped():
+    r = receiver(rcv_window=4)
+    send(r, 65, 17, 33, 49, 1) # 65 is 4 packets beyond rcvbase
+    assert r.rcvbase == 65
+    assert r.receiving_app.delivered == [1, 17, 33, 49]
+
+def test_large_sequence_numbers():
+    r = receiver(rcv_window=4)
+    r.rcvbase = 10**7 + 1
+    assert send(r, 10**7 + 17, 10**7 + 1) == [10**7 + 1, 10**7 + 33]
+
+def test_acks_advertise_the_receive_window():
+    r = receiver(rcv_window=4)
+    send(r, 1, 33)
+    assert [ack.window for ack in r.channel.sent] == [4 * 16, 4 * 16]
+    assert r.window_drops == 0
+    send(r, 81) # beyond the window
+    assert r.window_drops == 1
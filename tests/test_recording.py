@@ -0,0 +1,17 @@
+from Simulation import Simulation
+
+def test_ack_channel_records_no_cwnd():
+    sim = Simulation(algorithm="AIMD", seed=1)
+    sim.run(until=500)
+    assert len(sim.channel_for_ack.cwnd_values) == 0
+    assert len(sim.channel_for_ack.bandwidth_util) == 0
+    assert len(sim.channel_for_data.cwnd_values) == sim.channel_for_data.cwnd_values.num_samples > 0
+    assert min(sim.channel_for_data.cwnd_values.columns["value"]) > 0
+
+def test_bounded_recording():
+    sim = Simulation(algorithm="AIMD", seed=1, recording={"mode": "reservoir", "capacity": 50})
+    sim.run(until=2000, max_messages=None)
+    cwnd_values = sim.channel_for_data.cwnd_values
+    assert cwnd_values.num_samples > 50
+    assert len(cwnd_values) == 50
+    assert sim.summary()["recording"] == {"mode": "reservoir", "capacity": 50}
@@ -0,0 +1,29 @@
+import pytest
+from Simulation import Simulation
+from TCP_Protocol import RTTEstimator
+
+def test_rfc6298_estimates():
+    estimator = RTTEstimator(min_rto=0)
+    assert estimator.update(4) == 4 + 4 * 2 # SRTT = R, RTTVAR = R / 2
+    rto = estimator.update(6)
+    assert estimator.rttvar == pytest.approx(0.75 * 2 + 0.25 * 2)
+    assert estimator.srtt == pytest.approx(0.875 * 4 + 0.125 * 6)
+    assert rto == pytest.approx(estimator.srtt + 4 * estimator.rttvar)
+
+def test_rto_bounds_and_backoff():
+    estimator = RTTEstimator(min_rto=1, max_rto=60)
+    assert estimator.update(0.01) == 1
+    assert estimator.backoff(40) == 60
+
+def test_smoothed_rtt_follows_the_path():
+    sim = Simulation(algorithm="AIMD", propagation_delay=2, seed=1)
+    sim.run(until=500)
+    # Two propagation delays, plus the transmission and queueing delays
+    assert 4 <= sim.tcp_sender.rtt_estimator.srtt < 6
+    assert sim.tcp_sender.RTT == sim.tcp_sender.rtt_estimator.srtt
+
+def test_fixed_timeout_without_estimator():
+    sim = Simulation(algorithm="AIMD", timeout_value=7, seed=1)
+    sim.tcp_sender.rtt_estimator = None
+    sim.run(until=500)
+    assert sim.tcp_sender.timeout_value == 7
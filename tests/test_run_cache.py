@@ -0,0 +1,90 @@
+import os
+import tcpsim
+from RunCache import RunCache, code_version
+
+def test_put_and_get(tmp_path):
+    cache = RunCache(str(tmp_path))
+    key = cache.key({"algorithm": "AIMD", "seed": 1})
+    assert cache.get(key) is None
+    cache.put(key, {"messages_sent": 42})
+    assert cache.get(key) == {"messages_sent": 42}
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_key_depends_on_config_and_algorithm(tmp_path):
+    cache = RunCache(str(tmp_path))
+    config = {"algorithm": "AIMD", "seed": 1}
+    assert cache.key(config) == cache.key(dict(config))
+    assert cache.key(config) != cache.key(dict(config, seed=2))
+    assert cache.key(config) != cache.key(dict(config, algorithm="CUBIC"))
+
+def test_trace_file_contents_are_part_of_the_key(tmp_path):
+    cache = RunCache(str(tmp_path / "cache"))
+    trace = tmp_path / "trace.txt"
+    trace.write_text("1 1\n")
+    config = {"algorithm": "AIMD", "workload": "trace", "workload_params": {"path": str(trace)}}
+    key = cache.key(config)
+    trace.write_text("2 1\n")
+    assert cache.key(config) != key
+
+def test_unreadable_entry_is_dropped(tmp_path):
+    cache = RunCache(str(tmp_path))
+    key = cache.key({"algorithm": "AIMD"})
+    os.makedirs(os.path.dirname(cache.path(key)))
+    with open(cache.path(key), "wb") as f:
+        f.write(b"not a pickle")
+    assert cache.get(key) is None
+    assert not os.path.exists(cache.path(key))
+
+def test_evict_least_recently_used(tmp_path):
+    cache = RunCache(str(tmp_path))
+    keys = [cache.key({"algorithm": "AIMD", "seed": seed}) for seed in range(3)]
+    for age, key in enumerate(keys):
+        cache.put(key, b"x" * 1000)
+        os.utime(cache.path(key), (age, age))
+    cache.max_bytes = 2 * os.path.getsize(cache.path(keys[0]))
+    assert cache.evict() == 1
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[2]) is not None
+
+def test_tcpsim_reuses_cached_results(tmp_path, capsys):
+    args = ["--until", "50", "--max-messages", "20", "--cache", str(tmp_path), "-j", "1", "-o", str(tmp_path / "out.csv")]
+    tcpsim.main(args)
+    assert "cache: 0 hits, 1 misses" in capsys.readouterr().err
+    tcpsim.main(args)
+    assert "cache: 1 hits, 0 misses" in capsys.readouterr().err
+
+def test_equal_numbers_share_a_key(tmp_path):
+    cache = RunCache(str(tmp_path))
+    config = {"algorithm": "AIMD", "bandwidth": 100, "seed": 1, "recording": {"mode": "reservoir", "capacity": 50}}
+    same = {"algorithm": "AIMD", "bandwidth": 100.0, "seed": 1.0, "recording": {"mode": "reservoir", "capacity": 50.0}}
+    assert cache.key(config) == cache.key(same)
+    assert cache.key(config) != cache.key(dict(config, bandwidth=200))
+
+def test_default_and_explicit_value_hit_the_same_entry(tmp_path, capsys):
+    common = ["--until", "50", "--max-messages", "20", "--cache", str(tmp_path), "-j", "1", "-o", str(tmp_path / "out.csv")]
+    tcpsim.main(common)
+    assert "cache: 0 hits, 1 misses" in capsys.readouterr().err
+    tcpsim.main(common + ["--bandwidth", "100", "--propagation-delay", "2", "--timeout-value", "5"])
+    assert "cache: 1 hits, 0 misses" in capsys.readouterr().err
+
+def test_large_ints_keep_their_exact_value(tmp_path):
+    cache = RunCache(str(tmp_path))
+    assert cache.key({"algorithm": "AIMD", "seed": 2**53}) != cache.key({"algorithm": "AIMD", "seed": 2**53 + 1})
+    assert cache.key({"algorithm": "AIMD", "seed": 2**53}) == cache.key({"algorithm": "AIMD", "seed": float(2**53)})
+    assert cache.key({"algorithm": "AIMD", "bandwidth": 0.5}) != cache.key({"algorithm": "AIMD", "bandwidth": 1})
+    assert cache.key({"algorithm": "AIMD", "batch_delivery": True}) != cache.key({"algorithm": "AIMD", "batch_delivery": 1})
+
+def run_config_variant(config):
+    # A runner reporting something else
+    return {}
+
+def test_code_version_covers_tcpsim_run_config(monkeypatch):
+    version = code_version()
+    monkeypatch.setattr(tcpsim, "run_config", run_config_variant)
+    code_version.cache_clear()
+    try:
+        assert code_version() != version
+    finally:
+        monkeypatch.undo()
+        code_version.cache_clear()
+    assert code_version() == version
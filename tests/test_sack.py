@@ -0,0 +1,53 @@
+import simpy
+from Packet import Packet
+from TCP_Protocol import tcp_Sender
+from test_packet import RecordingChannel
+from test_receiver import receiver, send
+
+def sender_with_outstanding(count):
+    # A sender that sent "count" packets at time 0 and holds them in its buffer
+    env = simpy.Environment()
+    sender = tcp_Sender(env, "AIMD")
+    sender.channel = RecordingChannel()
+    sender.cwnd = count * sender.data_packet_length
+    for i in range(count):
+        sender.tcp_send(i)
+    sender.channel.sent.clear()
+    return sender
+
+def test_receiver_advertises_sack_blocks():
+    r = receiver()
+    send(r, 1, 33, 49, 81)
+    ack = r.channel.sent[-1]
+    assert ack.seq_num == 17
+    assert ack.sack == ((33, 65), (81, 97))
+    send(r, 17)
+    assert r.channel.sent[-1].seq_num == 65
+    assert r.channel.sent[-1].sack == ((81, 97),)
+
+def test_fast_retransmit_resends_every_hole():
+    sender = sender_with_outstanding(5) # sequence numbers 1, 17, 33, 49, 65
+    sender.tcp_rcv(Packet(None, 16, 17))
+    for _ in range(3):
+        sender.tcp_rcv(Packet(None, 16, 17, ((33, 49), (65, 81))))
+    assert sender.sacked == {33, 65}
+    assert [packt.seq_num for packt in sender.channel.sent] == [17, 49]
+
+def test_timeout_skips_sacked_packets():
+    sender = sender_with_outstanding(4)
+    sender.tcp_rcv(Packet(None, 16, 1, ((17, 33),)))
+    sender.timeout_action()
+    assert [packt.seq_num for packt in sender.channel.sent] == [1, 33, 49]
+
+def test_no_rtt_sample_for_sacked_packet():
+    sender = sender_with_outstanding(3) # sequence numbers 1, 17, 33
+    env = sender.env
+    env.run(until=1)
+    sender.tcp_rcv(Packet(None, 16, 1, ((17, 33),))) # 1 is lost, 17 is SACKed
+    env.run(until=50)
+    srtt, rto = sender.rtt_estimator.srtt, sender.timeout_value
+    # The cumulative ACK covering 17 arrives long after 17 was sent
+    sender.tcp_rcv(Packet(None, 16, 33))
+    assert sender.sendbase == 33
+    assert (sender.rtt_estimator.srtt, sender.timeout_value) == (srtt, rto)
+    assert not sender.sacked
@@ -0,0 +1,24 @@
+from Simulation import Simulation
+
+def test_stops_at_the_deadline():
+    sim = Simulation(algorithm="AIMD", seed=1)
+    assert sim.run(until=100, max_messages=None) == "time"
+    assert sim.env.now == 100
+
+def test_stops_after_max_messages():
+    sim = Simulation(algorithm="AIMD", seed=1)
+    assert sim.run(until=10000, max_messages=50) == "max_messages"
+    assert sim.receiving_app.total_messages_received >= 50
+    assert sim.env.now < 10000
+
+def test_stops_on_condition():
+    sim = Simulation(algorithm="AIMD", seed=1)
+    reason = sim.run(until=10000, max_messages=None, stop_when=lambda s: s.tcp_sender.total_packets_sent >= 30)
+    assert reason == "condition"
+    assert sim.tcp_sender.total_packets_sent >= 30
+    assert sim.env.now < 10000
+
+def test_print_status_samples_the_window():
+    sim = Simulation(algorithm="AIMD", seed=1)
+    sim.run(until=20, max_messages=None, print_status=True, sample_interval=2)
+    assert len(sim.tcp_sender.cwnd_trace) == 10
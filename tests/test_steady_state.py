@@ -0,0 +1,32 @@
+import pytest
+from statistics import mean
+from Simulation import Simulation
+from SteadyState import BatchMeans, SteadyStateDetector, t_quantile
+
+def test_t_quantile():
+    assert t_quantile(0.975, 10) == pytest.approx(2.228, abs=1e-2)
+    assert t_quantile(0.975, 1000) == pytest.approx(1.962, abs=1e-3)
+
+def test_batches_merge_when_full():
+    estimator = BatchMeans(batch_size=2, max_batches=4)
+    values = list(range(16))
+    for value in values:
+        estimator.add(value)
+    assert estimator.batch_size == 8
+    assert len(estimator.batches) == 2
+    assert estimator.mean() == mean(values)
+
+def test_constant_metric_is_stable():
+    estimator = BatchMeans(batch_size=1)
+    for _ in range(5):
+        estimator.add(3.0)
+    assert estimator.half_width() == 0
+
+def test_run_stops_once_stable():
+    sim = Simulation(algorithm="AIMD", seed=1)
+    detector = SteadyStateDetector(precision=0.1, tolerance=0.01)
+    assert sim.run(until=100000, max_messages=None, stop_when=detector) == "condition"
+    report = detector.report()
+    assert report["converged"]
+    assert report["throughput_ci"] <= max(0.1 * report["throughput_mean"], 0.01)
+    assert sim.env.now < 100000
@@ -0,0 +1,20 @@
+import csv
+import tcpsim
+
+def test_expand_grid():
+    configs = tcpsim.expand_grid({"algorithm": ["AIMD", "MIMD"], "seed": [1, 2, 3]}, until=10)
+    assert len(configs) == 6
+    assert configs[0] == {"algorithm": "AIMD", "seed": 1, "until": 10}
+    assert configs[-1] == {"algorithm": "MIMD", "seed": 3, "until": 10}
+
+def test_same_seed_same_result():
+    config = {"algorithm": "AIMD", "seed": 7, "until": 200, "max_messages": None}
+    assert tcpsim.run_config(config) == tcpsim.run_config(config)
+
+def test_results_table(tmp_path):
+    output = str(tmp_path / "results.csv")
+    tcpsim.main(["--algorithm", "AIMD", "MIMD", "--seed", "1", "2", "--until", "200", "-j", "1", "-o", output])
+    with open(output) as f:
+        rows = list(csv.DictReader(f))
+    assert [(row["algorithm"], row["seed"]) for row in rows] == [("AIMD", "1"), ("AIMD", "2"), ("MIMD", "1"), ("MIMD", "2")]
+    assert all(int(row["messages_received"]) > 0 for row in rows)
@@ -0,0 +1,51 @@
+import simpy
+from TCP_Protocol import tcp_Sender
+
+def timer_sender(timeout_value=5):
+    # A sender recording the times at which its timer expires
+    env = simpy.Environment()
+    sender = tcp_Sender(env, "AIMD")
+    sender.timeout_value = timeout_value
+    sender.rtt_estimator = None
+    sender.expiries = []
+    sender.timeout_action = lambda: sender.expiries.append(env.now)
+    return sender
+
+def at(sender, time, action):
+    sender.env.process(call_at(sender.env, time, action))
+
+def call_at(env, time, action):
+    yield env.timeout(time - env.now)
+    action()
+
+def test_timer_expires_at_its_deadline():
+    sender = timer_sender()
+    sender.start_timer()
+    sender.env.run(until=20)
+    assert sender.expiries == [5]
+    assert not sender.timer_is_running
+
+def test_restarting_moves_the_deadline():
+    sender = timer_sender()
+    sender.start_timer()
+    at(sender, 3, sender.restart_timer)
+    sender.env.run(until=20)
+    assert sender.expiries == [8]
+
+def test_stopped_timer_does_not_expire():
+    sender = timer_sender()
+    sender.start_timer()
+    at(sender, 3, sender.stop_timer)
+    at(sender, 10, sender.start_timer)
+    sender.env.run(until=20)
+    assert sender.expiries == [15]
+
+def test_earlier_deadline_after_a_longer_timeout():
+    sender = timer_sender(timeout_value=10)
+    sender.start_timer()
+    def shorter():
+        sender.timeout_value = 2
+        sender.start_timer()
+    at(sender, 1, shorter)
+    sender.env.run(until=20)
+    assert sender.expiries == [3]
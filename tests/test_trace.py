@@ -0,0 +1,52 @@
+import math
+import numpy
+from Simulation import Simulation
+from Trace import TraceReader, TraceWriter
+
+def test_write_and_read(tmp_path):
+    path = str(tmp_path / "trace")
+    with TraceWriter(path, chunk_size=2) as writer:
+        writer.record(0.0, "DATA_CHANNEL", "send", 1, 1.0)
+        writer.record(0.5, "DATA_CHANNEL", "send", 17, 1.0)
+        writer.record(2.0, "DATA_CHANNEL", "deliver", 1)
+        writer.record(4.0, "TCP_SENDER", "ack", 17, 2.0)
+        writer.record(6.0, "TCP_SENDER", "ack", 33, 3.0)
+    trace = TraceReader(path)
+    assert len(trace) == 5
+    assert trace.sources == ["DATA_CHANNEL", "TCP_SENDER"]
+    assert list(trace["seq"][trace.select("send", "DATA_CHANNEL")]) == [1, 17]
+    assert list(trace["cwnd"][trace.select("ack")]) == [2.0, 3.0]
+    assert math.isnan(trace["cwnd"][2])
+    # 1 is acknowledged by the ACK 17, 17 by the ACK 33, 33 never
+    assert list(trace.ack_times(numpy.array([1, 17, 33]))) == [4.0, 6.0, numpy.inf]
+
+def test_schema_only_counts_flushed_records(tmp_path):
+    path = str(tmp_path / "trace")
+    writer = TraceWriter(path, chunk_size=3)
+    for seq in (1, 17, 33, 49):
+        writer.record(0.0, "DATA_CHANNEL", "send", seq, 1.0)
+    assert len(TraceReader(path)) == 3
+    writer.close()
+    assert len(TraceReader(path)) == 4
+
+def test_simulation_trace_matches_summary(tmp_path):
+    path = str(tmp_path / "trace")
+    sim = Simulation(algorithm="AIMD", seed=1, trace=path)
+    sim.run(until=300, max_messages=10000)
+    sim.close()
+    result = sim.summary()
+    trace = TraceReader(path)
+    assert trace.select("send", "DATA_CHANNEL").sum() == result["packets_sent"]
+    assert trace.select("retransmit", "TCP_SENDER").sum() == result["retransmissions"]
+
+def test_tracing_does_not_change_the_results(tmp_path):
+    results = []
+    for trace in (None, str(tmp_path / "trace")):
+        sim = Simulation(algorithm="CUBIC", seed=1, trace=trace)
+        sim.run(until=300, max_messages=10000)
+        sim.close()
+        result = sim.summary()
+        assert result["trace"] == trace
+        del result["trace"]
+        results.append(result)
+    assert results[0] == results[1]
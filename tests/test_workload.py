@@ -0,0 +1,39 @@
+import pytest
+from Simulation import Simulation
+
+def run(workload, until=2000, **params):
+    sim = Simulation(algorithm="AIMD", bandwidth=10**9, workload=workload, workload_params=params, seed=1)
+    sim.run(until=until, max_messages=None)
+    return sim
+
+def offered(app):
+    return app.total_messages_sent + app.queued + app.messages_blocked
+
+def test_poisson_rate():
+    app = run("poisson", rate=0.5, size=2).sending_app
+    assert offered(app) == pytest.approx(2 * 0.5 * 2000, rel=0.1)
+
+def test_onoff_is_bursty():
+    app = run("onoff", rate=4, on_time=10, off_time=30).sending_app
+    # On 1/4 of the time on average, at 4 messages per unit of time
+    assert offered(app) == pytest.approx(2000, rel=0.3)
+
+def test_pareto_flow_sizes():
+    app = run("pareto", until=5000, flow_rate=0.05, shape=1.5, min_size=4).sending_app
+    assert len(app.flow_sizes) > 100
+    assert min(app.flow_sizes) >= 4
+    assert offered(app) == sum(app.flow_sizes)
+
+def test_trace_replay(tmp_path):
+    path = tmp_path / "arrivals.csv"
+    path.write_text("time,messages\n1,3\n2\n5.5,2\n")
+    sim = run("trace", until=200, path=str(path), time_scale=2)
+    assert offered(sim.sending_app) == 6
+    assert sim.receiving_app.total_messages_received == 6
+
+def test_reproducible():
+    assert run("onoff").summary() == run("onoff").summary()
+
+def test_unknown_workload():
+    with pytest.raises(ValueError):
+        run("constant")